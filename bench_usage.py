@@ -0,0 +1,68 @@
+"""
+Спільні вимірювання для бенчмарків домашніх завдань: піковий RSS і процесорний час.
+
+Бенчмарки (goit-cs-hw-01/task_2/bench_memory.py, goit-cs-hw-04/bench_search.py,
+goit-cs-hw-05/task_02/bench_map_reduce.py) запускають кожне вимірювання в окремому
+процесі й імпортують цей модуль, додаючи корінь репозиторію до sys.path.
+
+resource є лише в POSIX; у Windows піковий RSS вимірюється через psutil
+(необов'язкова залежність), а без нього повертається None.
+"""
+
+import sys
+
+try:
+    import resource
+except ImportError:  # Немає у Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:  # psutil - необов'язкова залежність для пікового RSS у Windows
+    psutil = None
+
+CPU_FIELDS = ("user", "system", "children_user", "children_system")
+
+
+def _own_peak_rss():
+    # Linux: VmHWM рахується з exec цього процесу, а ru_maxrss (RUSAGE_SELF) успадковує пік
+    # батьківського процесу, що запустив вимірювання, і завищує малі результати
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_bytes(children: bool = False):
+    """
+    Піковий RSS цього процесу в байтах або None, якщо виміряти неможливо.
+
+    :param children: Чи враховувати завершені дочірні процеси (лише в POSIX;
+                     psutil у Windows знає піковий робочий набір лише цього процесу).
+    """
+    own = _own_peak_rss()
+    if resource is not None:
+        scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss у Linux - у кілобайтах, у macOS - у байтах
+        if own is None:
+            own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        if children:
+            own = max(own, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
+        return own
+    if own is not None:
+        return own
+    if psutil is not None:
+        return getattr(psutil.Process().memory_info(), "peak_wset", None)
+    return None
+
+
+def cpu_seconds(start_times, end_times):
+    """
+    Процесорний час між двома знімками os.times() разом із завершеними дочірніми процесами.
+
+    У Windows час дочірніх процесів os.times() не враховує.
+    """
+    return sum(getattr(end_times, field) - getattr(start_times, field) for field in CPU_FIELDS)
@@ -0,0 +1,136 @@
+"""
+Паралельне пакетне обчислення виразів з файлу або стандартного входу.
+
+Кожен рядок входу - окремий незалежний вираз. Рядки читаються потоково,
+групуються в пакети по chunk_size і розподіляються між процесами пулу.
+Одночасно в роботі перебуває обмежена кількість пакетів, тож пам'ять не
+залежить від розміру входу, а результати виводяться в порядку рядків входу.
+
+Помилки LexicalError, ParsingError та помилки обчислення (ділення на нуль,
+невизначена змінна) повідомляються для конкретного рядка і не зупиняють обробку.
+Наприкінці в stderr виводиться пропускна здатність у виразах за секунду.
+
+Запуск: python batch_eval.py expressions.txt --workers 8 --chunk-size 1000
+        cat expressions.txt | python batch_eval.py -
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from expression_cache import ExpressionCache
+from stack_vm import compile_source
+from task2 import LexicalError, ParsingError
+
+
+# Кеш скомпільованих програм окремий для кожного процесу пулу
+_cache = None
+
+
+def evaluate_chunk(lines):
+    """
+    Обчислює пакет виразів у процесі пулу.
+
+    :param lines: Список рядків-виразів.
+    :return: Список пар (успіх, результат або текст помилки).
+    """
+    global _cache
+    if _cache is None:
+        _cache = ExpressionCache(maxsize=4096, compiler=compile_source)
+
+    results = []
+    for line in lines:
+        try:
+            results.append((True, _cache.evaluate(line)))
+        except (LexicalError, ParsingError) as e:
+            results.append((False, f"{type(e).__name__}: {e}"))
+        except Exception as e:
+            results.append((False, f"Помилка обчислення: {e}"))
+    return results
+
+
+def read_chunks(stream, chunk_size):
+    # Лінивий поділ потоку рядків на пакети
+    lines = (line.rstrip("\r\n") for line in stream)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_stream(stream, workers=None, chunk_size=1000, prefetch=2):
+    """
+    Обчислює вирази з потоку рядків, зберігаючи порядок входу.
+
+    :param stream: Ітерований об'єкт рядків (файл, sys.stdin).
+    :param workers: Кількість процесів (за замовчуванням - кількість ядер; 1 - без пулу).
+    :param chunk_size: Кількість виразів в одному пакеті.
+    :param prefetch: Скільки пакетів на процес може одночасно очікувати обробки.
+    :return: Генератор трійок (вираз, успіх, результат або текст помилки).
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = read_chunks(stream, chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            for line, (ok, value) in zip(chunk, evaluate_chunk(chunk)):
+                yield line, ok, value
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()  # Пакети в роботі в порядку надсилання
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(evaluate_chunk, chunk)))
+            # Обмежуємо кількість пакетів у роботі, щоб не читати весь вхід наперед
+            while len(pending) >= workers * prefetch:
+                yield from _finish(pending.popleft())
+        while pending:
+            yield from _finish(pending.popleft())
+
+
+def _finish(entry):
+    # Чекає на результат найстарішого пакета та видає його рядки
+    chunk, future = entry
+    for line, (ok, value) in zip(chunk, future.result()):
+        yield line, ok, value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Паралельне пакетне обчислення арифметичних виразів")
+    parser.add_argument("input", help="Файл з виразами (по одному в рядку) або '-' для stdin")
+    parser.add_argument("--workers", type=int, default=None, help="Кількість процесів (за замовчуванням - кількість ядер)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Кількість виразів в одному пакеті")
+    parser.add_argument("--output", help="Файл для результатів (за замовчуванням - stdout)")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    total = errors = 0
+    start_time = time.perf_counter()
+    try:
+        for line_number, (expression, ok, value) in enumerate(
+                evaluate_stream(source, args.workers, args.chunk_size), start=1):
+            total += 1
+            if ok:
+                output.write(f"{expression} = {value}\n")
+            else:
+                errors += 1
+                output.write(f"{expression} -> рядок {line_number}: {value}\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Оброблено виразів: {total} (з помилками: {errors}) за {elapsed:.2f} с; "
+          f"{total / elapsed if elapsed else 0:.0f} виразів/с", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Порівняння швидкодії посимвольного Lexer та пакетного BatchLexer з task2.py.
+
+Для кожного розміру генерується випадковий вираз заданої довжини, після чого
+обидва лексери повністю вичитують потік токенів через get_next_token().
+Окремо вимірюється час самої функції tokenize().
+
+Запуск: python bench_lexer.py [--sizes 1000 10000 100000 1000000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+
+from task2 import BatchLexer, Lexer, TokenType, tokenize
+
+
+def generate_expression(length, seed=0):
+    """
+    Генерує коректний арифметичний вираз довжиною приблизно length символів.
+    """
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    depth = 0  # Кількість відкритих дужок
+    while size < length:
+        if depth < 20 and rng.random() < 0.1:
+            parts.append("(")
+            depth += 1
+        parts.append(str(rng.randint(0, 9999)))
+        if depth and rng.random() < 0.1:
+            parts.append(")")
+            depth -= 1
+        parts.append(rng.choice("+-*/"))
+        size += len(parts[-2]) + 4
+    parts.append("1" + ")" * depth)
+    return " ".join(parts)
+
+
+def drain(lexer):
+    # Вичитує всі токени, повертає їх кількість
+    count = 0
+    while lexer.get_next_token().type != TokenType.EOF:
+        count += 1
+    return count
+
+
+def measure(function, repeat):
+    # Найкращий час з кількох повторів
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start_time)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк Lexer проти BatchLexer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6],
+                        help="Довжини виразів у символах")
+    parser.add_argument("--repeat", type=int, default=3, help="Кількість повторів кожного вимірювання")
+    args = parser.parse_args()
+
+    print(f"{'символів':>10} {'токенів':>10} {'Lexer, с':>10} {'BatchLexer, с':>14} {'tokenize, с':>12} {'прискорення':>12}")
+    for size in args.sizes:
+        text = generate_expression(size)
+        lexer_time, lexer_tokens = measure(lambda: drain(Lexer(text)), args.repeat)
+        batch_time, batch_tokens = measure(lambda: drain(BatchLexer(text)), args.repeat)
+        tokenize_time, _ = measure(lambda: tokenize(text), args.repeat)
+        if lexer_tokens != batch_tokens:
+            raise RuntimeError("Лексери повернули різну кількість токенів")
+        print(f"{len(text):>10} {lexer_tokens:>10} {lexer_time:>10.4f} {batch_time:>14.4f} "
+              f"{tokenize_time:>12.4f} {lexer_time / batch_time:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
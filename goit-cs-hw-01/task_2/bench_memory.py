@@ -0,0 +1,137 @@
+"""
+Порівняння споживання пам'яті різними представленнями AST для task2.py.
+
+Режими:
+    text   - лише згенерований текст (базова лінія для пікового RSS),
+    legacy - звичайні класи з __dict__ та токеном у кожному Num (як було раніше),
+    slots  - класи task2.py зі __slots__,
+    table  - плоска таблиця NodeTable.
+
+Кожен режим запускається в окремому процесі, щоб піковий RSS (ru_maxrss) не
+змішувався між режимами; всередині процесу додатково вимірюється пік tracemalloc
+під час розбору. У Windows піковий RSS вимірюється через psutil, а без нього
+виводяться лише показники tracemalloc.
+
+Запуск: python bench_memory.py [--size 2000000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# Спільне вимірювання пікового RSS лежить у корені репозиторію
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from bench_usage import peak_rss_bytes
+
+from bench_lexer import generate_expression
+from node_table import TableParser
+from task2 import BatchLexer, Parser
+
+
+# Класи вузлів у старому вигляді - з __dict__ на кожен екземпляр
+class LegacyToken:
+    def __init__(self, type, value):
+        self.type = type
+        self.value = value
+
+
+class LegacyBinOp:
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+
+class LegacyNum:
+    def __init__(self, token):
+        self.token = token
+        self.value = token.value
+
+
+class LegacyVar:
+    def __init__(self, token):
+        self.token = token
+        self.name = token.value
+
+
+class LegacyParser(Parser):
+    # Будує дерево зі старих класів; токени операторів копіюються, як це робив Lexer
+    def num_node(self, token):
+        return LegacyNum(LegacyToken(token.type, token.value))
+
+    def var_node(self, token):
+        return LegacyVar(LegacyToken(token.type, token.value))
+
+    def binop_node(self, left, op, right):
+        return LegacyBinOp(left, LegacyToken(op.type, op.value), right)
+
+
+def build(mode, text):
+    # Будує представлення дерева для обраного режиму
+    if mode == "text":
+        return None
+    if mode == "legacy":
+        return LegacyParser(BatchLexer(text)).expr()
+    if mode == "slots":
+        return Parser(BatchLexer(text)).expr()
+    if mode == "table":
+        return TableParser(BatchLexer(text)).parse()
+    raise ValueError(f"Невідомий режим: {mode}")
+
+
+def run_mode(mode, size):
+    # Вимірювання всередині дочірнього процесу
+    text = generate_expression(size)
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    tree = build(mode, text)
+    elapsed = time.perf_counter() - start_time
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_rss = peak_rss_bytes()
+    print(json.dumps({
+        "mode": mode,
+        "chars": len(text),
+        "parse_seconds": elapsed,
+        "tracemalloc_current": current,
+        "tracemalloc_peak": peak,
+        "peak_rss": peak_rss,
+    }))
+    del tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пам'яті для представлень AST")
+    parser.add_argument("--size", type=int, default=2_000_000, help="Довжина виразу в символах")
+    parser.add_argument("--mode", help=argparse.SUPPRESS)  # Внутрішній режим дочірнього процесу
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.size)
+        return
+
+    results = []
+    for mode in ("text", "legacy", "slots", "table"):
+        output = subprocess.run([sys.executable, __file__, "--mode", mode, "--size", str(args.size)],
+                                check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+
+    baseline_rss = results[0]["peak_rss"]
+    mib = 1024 * 1024
+    print(f"Вираз: {results[0]['chars']} символів")
+    print(f"{'режим':>8} {'розбір, с':>10} {'дерево, МіБ':>12} {'пік tracemalloc, МіБ':>21} {'пік RSS - текст, МіБ':>21}")
+    for result in results[1:]:
+        if baseline_rss is None or result["peak_rss"] is None:
+            rss = "н/д"  # Піковий RSS у цьому середовищі не вимірюється
+        else:
+            rss = f"{(result['peak_rss'] - baseline_rss) / mib:.1f}"
+        print(f"{result['mode']:>8} {result['parse_seconds']:>10.2f} {result['tracemalloc_current'] / mib:>12.1f} "
+              f"{result['tracemalloc_peak'] / mib:>21.1f} {rss:>21}")
+
+
+if __name__ == "__main__":
+    main()
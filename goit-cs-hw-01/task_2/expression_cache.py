@@ -0,0 +1,178 @@
+"""
+Кеш скомпільованих виразів для інтерпретатора з task2.py.
+
+Інтерпретатор щоразу заново запускає Lexer, Parser.expr() та рекурсивний обхід
+Interpreter.visit(). Якщо ті самі формули обчислюються багато разів, дешевше
+один раз перетворити синтаксичне дерево на ланцюжок замикань (closure) і далі
+просто викликати готову функцію.
+
+compile_tree() перетворює AST на функцію від словника змінних, а ExpressionCache
+зберігає такі функції за вихідним рядком з витісненням найдавніше
+використаних записів (LRU) та лічильниками влучань, промахів і витіснень.
+"""
+
+import operator
+from collections import OrderedDict
+
+from task2 import BinOp, Interpreter, Lexer, Num, Parser, TokenType, Var
+
+
+# Арифметичні операції, які не потребують окремої обробки помилок
+_OPERATIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+}
+
+# Максимальна глибина дерева, для якої будуються вкладені замикання. Виклик
+# замикань рекурсивний, тому глибші дерева обчислюються ітеративним Interpreter.visit
+MAX_CLOSURE_DEPTH = 200
+
+
+def tree_depth(node):
+    # Обчислює глибину дерева без рекурсії
+    depth = 0
+    stack = [(node, 1)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        if isinstance(node, BinOp):
+            stack.append((node.left, level + 1))
+            stack.append((node.right, level + 1))
+    return depth
+
+
+def compile_tree(node):
+    """
+    Перетворює синтаксичне дерево на функцію, що обчислює вираз.
+
+    :param node: Корінь AST, побудованого Parser.expr().
+    :return: Функція від необов'язкового словника змінних, яка повертає значення виразу.
+    """
+    if tree_depth(node) > MAX_CLOSURE_DEPTH:
+        return lambda variables=None: Interpreter(None, variables).visit(node)
+    return _compile_node(node)
+
+
+def _compile_node(node):
+    # Рекурсивно будує замикання для дерева обмеженої глибини
+    if isinstance(node, Num):
+        value = node.value
+        return lambda variables=None: value
+
+    if isinstance(node, Var):
+        name = node.name
+
+        def load(variables=None):
+            # Та сама поведінка, що й в Interpreter.visit_Var
+            try:
+                return variables[name]
+            except (KeyError, TypeError):
+                raise Exception(f"Невизначена змінна: {name}")
+        return load
+
+    if isinstance(node, BinOp):
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+
+        if node.op.type == TokenType.DIV:
+            def divide(variables=None):
+                # Та сама поведінка, що й в Interpreter.visit_BinOp
+                try:
+                    return left(variables) / right(variables)
+                except ZeroDivisionError:
+                    raise Exception("Ділення на нуль")
+            return divide
+
+        operation = _OPERATIONS[node.op.type]
+        return lambda variables=None: operation(left(variables), right(variables))
+
+    # Помилка, якщо вузол не підтримується (аналог Interpreter.generic_visit)
+    raise Exception(f"Метод відвідування не визначений: visit_{type(node).__name__}")
+
+
+def compile_expression(text):
+    """
+    Виконує лексичний і синтаксичний аналіз рядка та компілює отримане дерево.
+
+    :param text: Вихідний рядок виразу.
+    :return: Функція від необов'язкового словника змінних, яка повертає значення виразу.
+    """
+    return compile_tree(Parser(Lexer(text)).expr())
+
+
+class ExpressionCache:
+    """
+    LRU-кеш скомпільованих виразів, ключем якого є вихідний рядок.
+
+    Повторне обчислення виразу, що вже є в кеші, не запускає ні лексер, ні парсер.
+    """
+
+    def __init__(self, maxsize=1024, compiler=compile_expression):
+        """
+        :param maxsize: Максимальна кількість виразів у кеші (None - без обмежень).
+        :param compiler: Функція, що перетворює рядок на скомпільований вираз.
+        """
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("Розмір кешу має бути додатним числом або None")
+        self.maxsize = maxsize
+        self.compiler = compiler
+        self._entries = OrderedDict()  # Порядок ключів відповідає давності використання
+        self.hits = 0  # Кількість звернень, знайдених у кеші
+        self.misses = 0  # Кількість звернень, що потребували компіляції
+        self.evictions = 0  # Кількість витіснених записів
+
+    def get(self, text):
+        """
+        Повертає скомпільований вираз, компілюючи його лише за першого звернення.
+
+        Помилки LexicalError та ParsingError передаються викликачу, а вираз
+        з помилкою в кеш не потрапляє.
+        """
+        compiled = self._entries.get(text)
+        if compiled is not None:
+            self.hits += 1
+            self._entries.move_to_end(text)
+            return compiled
+
+        self.misses += 1
+        compiled = self.compiler(text)
+        self._entries[text] = compiled
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)  # Витісняємо найдавніше використаний вираз
+            self.evictions += 1
+        return compiled
+
+    def evaluate(self, text, variables=None):
+        # Обчислює вираз, використовуючи кешовану скомпільовану версію
+        return self.get(text)(variables)
+
+    def stats(self):
+        # Повертає лічильники кешу у вигляді словника
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        # Очищає кеш і скидає лічильники
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, text):
+        return text in self._entries
+
+
+# Демонстрація роботи кешу на повторюваних виразах
+if __name__ == "__main__":
+    cache = ExpressionCache(maxsize=4)
+    expressions = ["3 + 5", "(3 + 5) * 2", "14 + 2 * 3 - 6 / 2"] * 3 + ["10 - 2", "7 * 4", "8 / 2"]
+    for expression in expressions:
+        print(f"{expression} = {cache.evaluate(expression)}")
+    print(cache.stats())
@@ -0,0 +1,156 @@
+"""
+Компактне табличне представлення AST для виразів з task2.py.
+
+Замість окремого об'єкта Python на кожен вузол TableParser записує дерево
+у плоску таблицю NodeTable зі стовпцями-масивами:
+
+    ops   - код вузла (число, змінна або оператор),
+    left  - індекс лівого операнда (для числа - індекс у списку констант,
+            для змінної - індекс у списку імен),
+    right - індекс правого операнда.
+
+Парсер створює вузол лише після того, як створено обидва його операнди, тож
+таблиця вже впорядкована у зворотному польському порядку: evaluate_table()
+обчислює її одним лінійним проходом без стеку та рекурсії.
+"""
+
+from array import array
+
+from task2 import BatchLexer, Parser, TokenType
+
+
+# Коди вузлів у стовпці ops
+OP_NUM = 0
+OP_VAR = 1
+OP_ADD = 2
+OP_SUB = 3
+OP_MUL = 4
+OP_DIV = 5
+
+_OPCODES = {
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUB,
+    TokenType.MUL: OP_MUL,
+    TokenType.DIV: OP_DIV,
+}
+
+
+class NodeTable:
+    """
+    Плоска таблиця вузлів AST.
+    """
+
+    def __init__(self):
+        self.ops = array("b")  # Коди вузлів
+        self.left = array("q")  # Лівий операнд / індекс константи чи імені
+        self.right = array("q")  # Правий операнд (для листків - -1)
+        self.constants = []  # Унікальні числові константи
+        self.names = []  # Унікальні імена змінних
+        self.root = -1  # Індекс кореня дерева
+        self._constant_index = {}
+        self._name_index = {}
+
+    def add(self, op, left, right):
+        # Додає вузол і повертає його індекс
+        self.ops.append(op)
+        self.left.append(left)
+        self.right.append(right)
+        return len(self.ops) - 1
+
+    def add_constant(self, value):
+        # Числа з однаковим значенням зберігаються один раз
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.add(OP_NUM, index, -1)
+
+    def add_name(self, name):
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self.add(OP_VAR, index, -1)
+
+    def __len__(self):
+        return len(self.ops)
+
+
+class TableParser(Parser):
+    """
+    Парсер, що записує дерево в NodeTable замість створення об'єктів BinOp/Num/Var.
+
+    Вузлами є цілі індекси рядків таблиці.
+    """
+
+    def __init__(self, lexer):
+        self.table = NodeTable()
+        super().__init__(lexer)
+
+    def num_node(self, token):
+        return self.table.add_constant(token.value)
+
+    def var_node(self, token):
+        return self.table.add_name(token.value)
+
+    def binop_node(self, left, op, right):
+        return self.table.add(_OPCODES[op.type], left, right)
+
+    def parse(self):
+        # Розбирає вираз і повертає заповнену таблицю
+        self.table.root = self.expr()
+        return self.table
+
+
+def parse_to_table(text):
+    # Розбирає рядок одразу в табличне представлення
+    return TableParser(BatchLexer(text)).parse()
+
+
+def evaluate_table(table, variables=None):
+    """
+    Обчислює вираз, записаний у NodeTable, одним проходом по рядках таблиці.
+
+    Порядок обчислення (і, отже, перша помилка) збігається з Interpreter.
+    """
+    variables = variables if variables is not None else {}
+    constants = table.constants
+    names = table.names
+    left_column = table.left
+    right_column = table.right
+    values = [None] * (table.root + 1)  # Вузли після кореня не впливають на результат
+
+    for index, op in enumerate(table.ops[:table.root + 1]):
+        if op == OP_NUM:
+            values[index] = constants[left_column[index]]
+        elif op == OP_VAR:
+            name = names[left_column[index]]
+            try:
+                values[index] = variables[name]
+            except KeyError:
+                raise Exception(f"Невизначена змінна: {name}")
+        else:
+            left = values[left_column[index]]
+            right = values[right_column[index]]
+            if op == OP_ADD:
+                values[index] = left + right
+            elif op == OP_SUB:
+                values[index] = left - right
+            elif op == OP_MUL:
+                values[index] = left * right
+            else:
+                try:
+                    values[index] = left / right
+                except ZeroDivisionError:
+                    raise Exception("Ділення на нуль")
+
+    return values[table.root]
+
+
+# Демонстрація табличного представлення
+if __name__ == "__main__":
+    table = parse_to_table("14 + 2 * x - 6 / 2")
+    for index in range(len(table)):
+        print(index, table.ops[index], table.left[index], table.right[index])
+    print(f"Результат: {evaluate_table(table, {'x': 3})}")
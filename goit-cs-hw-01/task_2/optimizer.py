@@ -0,0 +1,213 @@
+"""
+Оптимізаційний прохід між Parser.expr() та Interpreter для виразів з task2.py.
+
+optimize() спрощує синтаксичне дерево трьома способами:
+
+1. Згортання констант: BinOp над двома числами замінюється результатом.
+   Ділення на нуль (та переповнення) не згортається, щоб помилка виникла
+   під час обчислення так само, як і без оптимізації.
+2. Алгебраїчні тотожності: x * 1, 1 * x, x - 0 завжди, а x + 0, 0 + x та
+   x * 0 - лише коли x гарантовано ціле (інакше, наприклад, -0.0 + 0 дає 0.0,
+   а x * 0 приховало б ділення на нуль усередині x).
+3. Усунення спільних підвиразів: однакові піддерева замінюються одним спільним
+   вузлом, тож результат може бути орієнтованим ациклічним графом, а не деревом.
+
+Прохід ітеративний, тому працює з такими ж глибокими деревами, як і Parser.
+"""
+
+import operator
+
+from task2 import BinOp, Lexer, Num, Parser, Token, TokenType, Var
+
+
+# Операції для згортання констант; результати збігаються з Interpreter
+_OPERATIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+    TokenType.DIV: operator.truediv,
+}
+
+
+class OptimizationStats:
+    """
+    Статистика оптимізації дерева.
+    """
+
+    def __init__(self):
+        self.nodes_before = 0  # Кількість вузлів у вхідному дереві
+        self.nodes_after = 0  # Кількість унікальних вузлів після оптимізації
+        self.folded = 0  # Кількість згорнутих константних операцій
+        self.simplified = 0  # Кількість застосованих алгебраїчних тотожностей
+        self.deduplicated = 0  # Кількість вузлів, замінених спільними
+
+    @property
+    def eliminated(self):
+        # Скільки вузлів усунуто загалом
+        return self.nodes_before - self.nodes_after
+
+    def __str__(self):
+        return (f"вузлів: {self.nodes_before} -> {self.nodes_after} (усунуто {self.eliminated}; "
+                f"згорнуто {self.folded}, спрощено {self.simplified}, спільних {self.deduplicated})")
+
+
+class Optimizer:
+    """
+    Виконує згортання констант, спрощення та усунення спільних підвиразів.
+    """
+
+    def __init__(self, int_variables=False):
+        """
+        :param int_variables: Чи гарантовано всі змінні визначені та цілі. Лише тоді
+                              тотожності x + 0 та x * 0 застосовуються до виразів зі змінними.
+        """
+        self.int_variables = int_variables
+        self.stats = OptimizationStats()
+        self._nodes = {}  # Ключ структури вузла -> спільний вузол
+        self._is_int = {}  # id спільного вузла -> чи значення гарантовано ціле
+
+    def optimize(self, tree):
+        # Обходить дерево в зворотному порядку без рекурсії
+        results = {}  # id вихідного вузла -> оптимізований вузол
+        stack = [(tree, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if id(node) in results:
+                continue
+            if isinstance(node, BinOp) and not children_done:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+
+            self.stats.nodes_before += 1
+            if isinstance(node, BinOp):
+                optimized = self._binop(node, results[id(node.left)], results[id(node.right)])
+            elif isinstance(node, Num):
+                optimized = self._shared(("num", type(node.value).__name__, repr(node.value)), node,
+                                         type(node.value) is int)
+            elif isinstance(node, Var):
+                optimized = self._shared(("var", node.name), node, self.int_variables)
+            else:
+                raise Exception(f"Метод відвідування не визначений: visit_{type(node).__name__}")
+            results[id(node)] = optimized
+
+        # Рахуємо вузли, що залишилися (спільні вузли - один раз)
+        self.stats.nodes_after += _count_unique(results[id(tree)])
+        return results[id(tree)]
+
+    def _shared(self, key, node, is_int):
+        # Повертає вже наявний однаковий вузол або реєструє новий
+        shared = self._nodes.get(key)
+        if shared is not None:
+            self.stats.deduplicated += 1
+            return shared
+        self._nodes[key] = node
+        self._is_int[id(node)] = is_int
+        return node
+
+    def _number(self, value):
+        # Створює (або перевикористовує) вузол числа; результат згортки може бути дробовим
+        return self._shared(("num", type(value).__name__, repr(value)), Num(Token(TokenType.INTEGER, value)),
+                            type(value) is int)
+
+    def _binop(self, node, left, right):
+        op_type = node.op.type
+
+        # 1. Згортання констант
+        if isinstance(left, Num) and isinstance(right, Num):
+            try:
+                value = _OPERATIONS[op_type](left.value, right.value)
+            except (ZeroDivisionError, OverflowError):
+                pass  # Помилку має повернути саме обчислення
+            else:
+                self.stats.folded += 1
+                return self._number(value)
+
+        # 2. Алгебраїчні тотожності
+        simplified = self._simplify(op_type, left, right)
+        if simplified is not None:
+            self.stats.simplified += 1
+            return simplified
+
+        # 3. Спільні підвирази: дочірні вузли вже спільні, тож достатньо їхніх id
+        is_int = op_type != TokenType.DIV and self._is_int[id(left)] and self._is_int[id(right)]
+        if left is node.left and right is node.right:
+            candidate = node
+        else:
+            candidate = BinOp(left=left, op=node.op, right=right)
+        return self._shared(("op", op_type, id(left), id(right)), candidate, is_int)
+
+    def _simplify(self, op_type, left, right):
+        # Повертає спрощений вузол або None, якщо тотожність незастосовна
+        def is_const(node, value):
+            return isinstance(node, Num) and type(node.value) is int and node.value == value
+
+        if op_type == TokenType.MUL:
+            if is_const(right, 1):
+                return left
+            if is_const(left, 1):
+                return right
+            if (is_const(right, 0) and self._is_int[id(left)]) or (is_const(left, 0) and self._is_int[id(right)]):
+                return self._number(0)
+        elif op_type == TokenType.MINUS:
+            if is_const(right, 0):
+                return left
+        elif op_type == TokenType.PLUS:
+            if is_const(right, 0) and self._is_int[id(left)]:
+                return left
+            if is_const(left, 0) and self._is_int[id(right)]:
+                return right
+        return None
+
+
+def _count_unique(tree):
+    # Кількість унікальних вузлів графа (спільні вузли рахуються один раз)
+    seen = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, BinOp):
+            stack.append(node.left)
+            stack.append(node.right)
+    return len(seen)
+
+
+def optimize(tree, int_variables=False):
+    """
+    Оптимізує синтаксичне дерево.
+
+    :param tree: Корінь AST, побудованого Parser.expr().
+    :param int_variables: Чи вважати всі змінні визначеними цілими числами.
+    :return: Пара (оптимізоване дерево, OptimizationStats).
+    """
+    optimizer = Optimizer(int_variables=int_variables)
+    return optimizer.optimize(tree), optimizer.stats
+
+
+def optimize_expression(text, int_variables=False):
+    # Розбирає рядок і оптимізує отримане дерево
+    return optimize(Parser(Lexer(text)).expr(), int_variables=int_variables)
+
+
+# Демонстрація оптимізації
+if __name__ == "__main__":
+    from task2 import Interpreter
+
+    expressions = [
+        "(2 + 3) * (4 - 1) + x * 1",
+        "(x + y) * (x + y) - (x + y) * 0",
+        "x * (10 / 5 - 2) + 0",
+        "1 / (3 - 3) + x",
+    ]
+    variables = {"x": 7, "y": 2}
+    for expression in expressions:
+        tree, stats = optimize_expression(expression)
+        try:
+            result = Interpreter(None, variables).visit(tree)
+        except Exception as e:
+            result = e
+        print(f"{expression} = {result}; {stats}")
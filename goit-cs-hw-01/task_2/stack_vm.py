@@ -0,0 +1,334 @@
+"""
+Компілятор AST у байткод і стекова віртуальна машина для виразів з task2.py.
+
+Дерево компілюється в лінійну постфіксну програму: два паралельні компактні
+масиви кодів операцій і аргументів плюс таблиці констант та імен змінних.
+VirtualMachine виконує програму одним циклом зі стеком значень і може
+використовуватися замість Interpreter.
+
+Якщо дерево містить спільні вузли (див. optimizer.py), спільний підвираз
+обчислюється один раз: результат зберігається в тимчасовий слот інструкцією
+STORE, а наступні входження читають його інструкцією RECALL.
+
+Програми серіалізуються в байти (Program.to_bytes / Program.from_bytes), тому
+ProgramCache може зберігати їх на диску й завантажувати під час старту без
+повторного лексичного та синтаксичного аналізу.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from task2 import BatchLexer, BinOp, Num, Parser, TokenType, Var
+from node_table import OP_ADD, OP_DIV, OP_MUL, OP_NUM, OP_SUB, OP_VAR
+from optimizer import optimize as optimize_tree
+
+
+# Коди інструкцій
+CONST = 0  # Покласти на стек константу constants[arg]
+LOAD = 1  # Покласти на стек значення змінної names[arg]
+ADD = 2  # Замінити два верхні значення їх сумою
+SUB = 3  # ... різницею
+MUL = 4  # ... добутком
+DIV = 5  # ... часткою
+STORE = 6  # Зберегти верхнє значення в тимчасовий слот arg (значення лишається на стеку)
+RECALL = 7  # Покласти на стек значення тимчасового слота arg
+
+_BINARY_OPCODES = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUB,
+    TokenType.MUL: MUL,
+    TokenType.DIV: DIV,
+}
+
+# Відповідність кодів вузлів NodeTable інструкціям
+_TABLE_OPCODES = {
+    OP_NUM: CONST,
+    OP_VAR: LOAD,
+    OP_ADD: ADD,
+    OP_SUB: SUB,
+    OP_MUL: MUL,
+    OP_DIV: DIV,
+}
+
+# Заголовок серіалізованої програми: сигнатура, версія формату, довжина метаданих, кількість інструкцій
+_MAGIC = b"T2VM"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBII")
+
+
+class Program:
+    """
+    Скомпільована програма стекової машини.
+    """
+
+    def __init__(self, ops=None, args=None, constants=None, names=None, slot_count=0):
+        self.ops = ops if ops is not None else array("B")  # Коди інструкцій
+        self.args = args if args is not None else array("l")  # Аргументи інструкцій
+        self.constants = constants if constants is not None else []  # Таблиця констант
+        self.names = names if names is not None else []  # Таблиця імен змінних
+        self.slot_count = slot_count  # Кількість тимчасових слотів для спільних підвиразів
+        self._constant_index = {(type(value), value): index for index, value in enumerate(self.constants)}
+        self._name_index = {name: index for index, name in enumerate(self.names)}
+
+    def emit(self, op, arg=0):
+        # Додає інструкцію в кінець програми
+        self.ops.append(op)
+        self.args.append(arg)
+
+    def emit_constant(self, value):
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        self.emit(CONST, index)
+
+    def emit_load(self, name):
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        self.emit(LOAD, index)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __call__(self, variables=None):
+        # Програму можна викликати як скомпільований вираз (сумісно з ExpressionCache)
+        return run(self, variables)
+
+    def to_bytes(self):
+        """
+        Серіалізує програму: заголовок, метадані в JSON, коди інструкцій та аргументи (little-endian).
+        """
+        metadata = json.dumps({
+            "constants": self.constants,
+            "names": self.names,
+            "slot_count": self.slot_count,
+        }).encode("utf-8")
+        args = array("q", self.args)
+        if sys.byteorder == "big":
+            args.byteswap()
+        return _HEADER.pack(_MAGIC, _VERSION, len(metadata), len(self.ops)) + metadata + self.ops.tobytes() + args.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        # Відновлює програму, серіалізовану методом to_bytes
+        magic, version, metadata_size, length = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Непідтримуваний формат скомпільованої програми")
+        offset = _HEADER.size
+        metadata = json.loads(data[offset:offset + metadata_size].decode("utf-8"))
+        offset += metadata_size
+        ops = array("B", data[offset:offset + length])
+        offset += length
+        args = array("q", data[offset:offset + 8 * length])
+        if sys.byteorder == "big":
+            args.byteswap()
+        if len(ops) != length or len(args) != length:
+            raise ValueError("Пошкоджена скомпільована програма")
+        return cls(ops, array("l", args), metadata["constants"], metadata["names"], metadata["slot_count"])
+
+
+def compile_tree(tree):
+    """
+    Компілює AST (або граф зі спільними вузлами) у програму стекової машини.
+
+    Обхід ітеративний, порядок інструкцій збігається з порядком обчислення
+    Interpreter.visit, тож і перша помилка буде тією самою.
+    """
+    # Підраховуємо, скільки разів на кожен вузол BinOp посилаються інші вузли
+    references = {}
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinOp):
+            count = references.get(id(node), 0)
+            references[id(node)] = count + 1
+            if count == 0:
+                stack.append(node.left)
+                stack.append(node.right)
+
+    program = Program()
+    slots = {}  # id спільного вузла -> номер тимчасового слота
+    stack = [(tree, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if isinstance(node, Num):
+            program.emit_constant(node.value)
+        elif isinstance(node, Var):
+            program.emit_load(node.name)
+        elif isinstance(node, BinOp):
+            slot = slots.get(id(node))
+            if slot is not None:
+                program.emit(RECALL, slot)  # Спільний підвираз уже обчислено
+            elif not children_done:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                program.emit(_BINARY_OPCODES[node.op.type])
+                if references[id(node)] > 1:
+                    slots[id(node)] = program.slot_count
+                    program.emit(STORE, program.slot_count)
+                    program.slot_count += 1
+        else:
+            raise Exception(f"Метод відвідування не визначений: visit_{type(node).__name__}")
+    return program
+
+
+def compile_table(table):
+    """
+    Компілює NodeTable: таблиця вже впорядкована постфіксно, тож достатньо перекласти коди.
+    """
+    length = table.root + 1
+    ops = array("B", (_TABLE_OPCODES[op] for op in table.ops[:length]))
+    args = array("l", (arg if op in (OP_NUM, OP_VAR) else 0 for op, arg in zip(table.ops[:length], table.left[:length])))
+    return Program(ops, args, list(table.constants), list(table.names))
+
+
+def compile_source(text, optimize=False):
+    """
+    Розбирає рядок і компілює його в програму.
+
+    :param optimize: Чи виконувати перед компіляцією оптимізаційний прохід (optimizer.py).
+    """
+    tree = Parser(BatchLexer(text)).expr()
+    if optimize:
+        tree, _ = optimize_tree(tree)
+    return compile_tree(tree)
+
+
+def run(program, variables=None):
+    """
+    Виконує програму на стековій машині.
+
+    :param variables: Словник значень змінних.
+    :return: Значення виразу.
+    """
+    variables = variables if variables is not None else {}
+    constants = program.constants
+    names = program.names
+    slots = [None] * program.slot_count
+    stack = []
+    push = stack.append
+    pop = stack.pop
+
+    for op, arg in zip(program.ops, program.args):
+        if op == CONST:
+            push(constants[arg])
+        elif op == LOAD:
+            try:
+                push(variables[names[arg]])
+            except KeyError:
+                raise Exception(f"Невизначена змінна: {names[arg]}")
+        elif op == ADD:
+            right = pop()
+            stack[-1] = stack[-1] + right
+        elif op == SUB:
+            right = pop()
+            stack[-1] = stack[-1] - right
+        elif op == MUL:
+            right = pop()
+            stack[-1] = stack[-1] * right
+        elif op == DIV:
+            right = pop()
+            try:
+                stack[-1] = stack[-1] / right
+            except ZeroDivisionError:
+                raise Exception("Ділення на нуль")
+        elif op == STORE:
+            slots[arg] = stack[-1]
+        else:
+            push(slots[arg])
+
+    return stack[-1]
+
+
+class VirtualMachine:
+    """
+    Заміна Interpreter на основі байткоду: той самий інтерфейс interpret().
+    """
+
+    def __init__(self, parser, variables=None):
+        self.parser = parser
+        self.variables = variables if variables is not None else {}
+
+    def interpret(self):
+        # Компілює дерево з парсера та виконує отриману програму
+        return run(compile_tree(self.parser.expr()), self.variables)
+
+
+class ProgramCache:
+    """
+    Дисковий кеш скомпільованих програм, ключем якого є SHA-256 вихідного рядка.
+    """
+
+    SUFFIX = ".t2vm"
+
+    def __init__(self, directory, optimize=False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.optimize = optimize
+        self._programs = {}  # Завантажені в пам'ять програми за ключем
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return self.directory / (key + self.SUFFIX)
+
+    def preload(self):
+        # Завантажує всі збережені програми під час старту; повертає їх кількість
+        for path in self.directory.glob("*" + self.SUFFIX):
+            try:
+                self._programs[path.stem] = Program.from_bytes(path.read_bytes())
+            except (ValueError, struct.error):
+                path.unlink()  # Пошкоджений або застарілий файл буде перекомпільовано
+        return len(self._programs)
+
+    def get(self, text):
+        """
+        Повертає програму з пам'яті, з диска або компілює і зберігає її.
+        """
+        key = self.key(text)
+        program = self._programs.get(key)
+        if program is not None:
+            return program
+
+        path = self.path(key)
+        try:
+            program = Program.from_bytes(path.read_bytes())
+        except (FileNotFoundError, ValueError, struct.error):
+            program = compile_source(text, optimize=self.optimize)
+            # Атомарний запис: спершу тимчасовий файл, потім перейменування
+            temporary = path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_bytes(program.to_bytes())
+            os.replace(temporary, path)
+        self._programs[key] = program
+        return program
+
+    def evaluate(self, text, variables=None):
+        return run(self.get(text), variables)
+
+
+# Демонстрація роботи віртуальної машини
+if __name__ == "__main__":
+    import tempfile
+
+    expression = "(x + y) * (x + y) - 14 / 2"
+    program = compile_source(expression, optimize=True)
+    for op, arg in zip(program.ops, program.args):
+        print(op, arg)
+    print(f"{expression} = {program({'x': 3, 'y': 4})}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        ProgramCache(directory).get(expression)
+        cache = ProgramCache(directory)
+        print(f"Завантажено з диска: {cache.preload()}; результат: {cache.evaluate(expression, {'x': 1, 'y': 1})}")
@@ -12,6 +12,9 @@
 
 """
 
+import operator
+import re
+
 
 # Визначення власних винятків, які будуть використовуватися для обробки помилок
 class LexicalError(Exception):
@@ -25,6 +28,7 @@ class ParsingError(Exception):
 # Типи токенів, які визначають можливі елементи математичного виразу
 class TokenType:
     INTEGER = "INTEGER"  # Цілі числа, наприклад, "2", "345"
+    ID = "ID"  # Ідентифікатори змінних, наприклад, "x", "price_2"
     PLUS = "PLUS"  # Символ "+"
     MINUS = "MINUS"  # Символ "-"
     MUL = "MUL"  # Символ "*"
@@ -36,6 +40,8 @@ class TokenType:
 
 # Клас, що представляє токени (лексеми) в тексті
 class Token:
+    __slots__ = ("type", "value")  # Без __dict__: токенів може бути мільйони
+
     def __init__(self, type, value):
         self.type = type  # Тип токена (наприклад, INTEGER, PLUS тощо)
         self.value = value  # Значення токена (наприклад, "3", "+")
@@ -73,6 +79,14 @@ class Lexer:
             self.advance()
         return int(result)  # Повертає цілочисельне значення
 
+    def identifier(self):
+        # Збирає ім'я змінної: літери, цифри та підкреслення
+        result = ""
+        while self.current_char is not None and (self.current_char.isalnum() or self.current_char == "_"):
+            result += self.current_char
+            self.advance()
+        return result
+
     def get_next_token(self):
         # Головний метод для отримання наступного токена з вхідного рядка
         while self.current_char is not None:
@@ -85,6 +99,10 @@ class Lexer:
             if self.current_char.isdigit():
                 return Token(TokenType.INTEGER, self.integer())
 
+            # Якщо символ є літерою або підкресленням, зчитується ідентифікатор
+            if self.current_char.isalpha() or self.current_char == "_":
+                return Token(TokenType.ID, self.identifier())
+
             # Обробка математичних операторів
             if self.current_char == "+":
                 self.advance()
@@ -112,13 +130,95 @@ class Lexer:
         return Token(TokenType.EOF, None)
 
 
+# Регулярний вираз, який за один прохід розбиває текст на лексеми:
+# ідентифікатори, послідовності цифр або окремі непробільні символи (пробіли пропускаються)
+_LEXEME_RE = re.compile(r"[^\W\d]\w*|\d+|\S")
+
+# Відповідність символів операторів і дужок типам токенів
+_SYMBOL_TYPES = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MUL,
+    "/": TokenType.DIV,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+}
+
+
+def tokenize(text):
+    """
+    Розбиває весь вхідний рядок на токени за один прохід скомпільованим регулярним виразом.
+
+    Повертає компактний потік токенів у вигляді двох паралельних списків - типів
+    і значень, - а також індекс першої нерозпізнаної лексеми (або None).
+    Токени до помилки залишаються у списках, щоб помилка виникала в тому самому
+    місці потоку, що й у Lexer.
+    """
+    types = []
+    values = []
+    for lexeme in _LEXEME_RE.findall(text):
+        token_type = _SYMBOL_TYPES.get(lexeme)
+        if token_type is not None:
+            types.append(token_type)
+            values.append(lexeme)
+        elif lexeme.isdigit():
+            types.append(TokenType.INTEGER)
+            values.append(int(lexeme))
+        elif lexeme[0].isalpha() or lexeme[0] == "_":
+            types.append(TokenType.ID)
+            values.append(lexeme)
+        else:
+            return types, values, len(types)
+    return types, values, None
+
+
+# Спільні екземпляри токенів операторів і дужок: вони незмінні, тож BatchLexer
+# не створює новий об'єкт для кожного входження
+_SYMBOL_TOKENS = {token_type: Token(token_type, symbol) for symbol, token_type in _SYMBOL_TYPES.items()}
+
+
+# Пакетний лексер: токенізує весь текст одразу, а потім видає токени по одному
+class BatchLexer:
+    def __init__(self, text):
+        self.text = text  # Вхідний рядок виразу
+        self.types, self.values, self.error_index = tokenize(text)
+        self.index = 0  # Індекс наступного токена в потоці
+        self.pos = 0  # Позиція в тексті; оновлюється на помилці та в кінці тексту
+
+    def error_position(self):
+        # Позиція нерозпізнаного символу в тексті (обчислюється лише у разі помилки)
+        for index, match in enumerate(_LEXEME_RE.finditer(self.text)):
+            if index == self.error_index:
+                return match.start()
+        return len(self.text)
+
+    def get_next_token(self):
+        # Повертає наступний токен з уже підготовленого потоку
+        index = self.index
+        if index < len(self.types):
+            self.index = index + 1
+            token_type = self.types[index]
+            token = _SYMBOL_TOKENS.get(token_type)
+            return token if token is not None else Token(token_type, self.values[index])
+
+        if self.error_index is not None:
+            # Як і Lexer, зупиняємося на невідомому символі
+            self.pos = self.error_position()
+            raise LexicalError("Лексична помилка: невідомий символ")
+
+        self.pos = len(self.text)
+        return Token(TokenType.EOF, None)
+
+
 # Абстрактне синтаксичне дерево (AST) - базовий клас
 class AST:
-    pass
+    __slots__ = ()  # Вузли зберігають атрибути в слотах, без __dict__ на кожен екземпляр
 
 
 # Вузол AST для операцій (додавання, віднімання, множення, ділення)
 class BinOp(AST):
+    __slots__ = ("left", "op", "right")
+
     def __init__(self, left, op, right):
         self.left = left  # Лівий операнд
         self.op = op  # Оператор (токен типу PLUS, MINUS тощо)
@@ -127,9 +227,28 @@ class BinOp(AST):
 
 # Вузол AST для чисел
 class Num(AST):
+    __slots__ = ("value",)
+
     def __init__(self, token):
-        self.token = token  # Токен, що представляє число
-        self.value = token.value  # Значення числа
+        self.value = token.value  # Значення числа (сам токен не зберігається)
+
+    @property
+    def token(self):
+        # Токен, що представляє число, відновлюється за потреби
+        return Token(TokenType.INTEGER, self.value)
+
+
+# Вузол AST для змінних
+class Var(AST):
+    __slots__ = ("name",)
+
+    def __init__(self, token):
+        self.name = token.value  # Ім'я змінної (сам токен не зберігається)
+
+    @property
+    def token(self):
+        # Токен, що представляє ідентифікатор, відновлюється за потреби
+        return Token(TokenType.ID, self.name)
 
 
 # Парсер, який будує синтаксичне дерево (AST) з токенів
@@ -148,87 +267,161 @@ class Parser:
         else:
             self.error()
 
+    # Фабричні методи вузлів: підкласи можуть будувати інше представлення дерева
+    def num_node(self, token):
+        return Num(token)
+
+    def var_node(self, token):
+        return Var(token)
+
+    def binop_node(self, left, op, right):
+        return BinOp(left=left, op=op, right=right)
+
     def factor(self):
-        # Обробка чисел та виразів у дужках
+        # Обробка чисел та змінних (вирази у дужках обробляє expr() через явний стек)
         token = self.current_token
         if token.type == TokenType.INTEGER:
             self.eat(TokenType.INTEGER)
-            return Num(token)
-        elif token.type == TokenType.LPAREN:
-            self.eat(TokenType.LPAREN)
-            node = self.expr()  # Рекурсивно обробляється вираз у дужках
-            self.eat(TokenType.RPAREN)
-            return node
-
-    def term(self):
-        # Обробка множення та ділення
-        node = self.factor()
-
-        while self.current_token.type in (TokenType.MUL, TokenType.DIV):
-            token = self.current_token
-            if token.type == TokenType.MUL:
-                self.eat(TokenType.MUL)
-            elif token.type == TokenType.DIV:
-                self.eat(TokenType.DIV)
-
-            node = BinOp(left=node, op=token, right=self.factor())
-
-        return node
+            return self.num_node(token)
+        elif token.type == TokenType.ID:
+            self.eat(TokenType.ID)
+            return self.var_node(token)
+        self.error()
 
     def expr(self):
-        # Обробка додавання та віднімання
-        node = self.term()
-
-        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
-            token = self.current_token
-            if token.type == TokenType.PLUS:
-                self.eat(TokenType.PLUS)
-            elif token.type == TokenType.MINUS:
-                self.eat(TokenType.MINUS)
-
-            node = BinOp(left=node, op=token, right=self.term())
-
-        return node
+        """
+        Будує AST за граматикою:
+
+            expr   : term ((PLUS | MINUS) term)*
+            term   : factor ((MUL | DIV) factor)*
+            factor : INTEGER | ID | LPAREN expr RPAREN
+
+        Розбір виконується без рекурсії: для кожної відкритої дужки стан незавершених
+        expr і term зовнішнього рівня зберігається на явному стеку, тому глибина
+        вкладеності обмежена лише пам'яттю, а не лімітом рекурсії Python.
+        """
+        frames = []  # Збережені стани зовнішніх рівнів дужок
+        expr_node = expr_op = term_node = term_op = None
+
+        while True:
+            # Очікується factor: кожна відкрита дужка відкладає поточний стан на стек
+            while self.current_token.type == TokenType.LPAREN:
+                self.eat(TokenType.LPAREN)
+                frames.append((expr_node, expr_op, term_node, term_op))
+                expr_node = expr_op = term_node = term_op = None
+            node = self.factor()
+
+            while True:
+                # Обробка множення та ділення: завершений factor приєднується до term
+                term_node = node if term_op is None else self.binop_node(term_node, term_op, node)
+                token = self.current_token
+                if token.type in (TokenType.MUL, TokenType.DIV):
+                    self.eat(token.type)
+                    term_op = token
+                    break
+
+                # Обробка додавання та віднімання: завершений term приєднується до expr
+                expr_node = term_node if expr_op is None else self.binop_node(expr_node, expr_op, term_node)
+                if token.type in (TokenType.PLUS, TokenType.MINUS):
+                    self.eat(token.type)
+                    expr_op = token
+                    term_op = None
+                    break
+
+                # Вираз поточного рівня завершено
+                if not frames:
+                    return expr_node
+                self.eat(TokenType.RPAREN)
+                node = expr_node  # Вираз у дужках стає factor зовнішнього рівня
+                expr_node, expr_op, term_node, term_op = frames.pop()
 
 
 # Інтерпретатор, який обчислює значення виразу на основі побудованого синтаксичного дерева
 class Interpreter:
-    def __init__(self, parser):
+    def __init__(self, parser, variables=None):
         self.parser = parser
+        self.variables = variables if variables is not None else {}  # Значення змінних за іменами
+        # Таблиці диспетчеризації будуються один раз, а не для кожного вузла
+        self.visitors = self.build_visitors()
+        self.operations = self.build_operations()
+
+    def build_visitors(self):
+        # Відповідність класів листків AST методам відвідування
+        return {Num: self.visit_Num, Var: self.visit_Var}
+
+    def build_operations(self):
+        # Відповідність типів токенів операторів функціям обчислення
+        return {
+            TokenType.PLUS: operator.add,
+            TokenType.MINUS: operator.sub,
+            TokenType.MUL: operator.mul,
+            TokenType.DIV: self.divide,
+        }
+
+    def divide(self, left, right):
+        # Ділення з перетворенням ZeroDivisionError на помилку інтерпретатора
+        try:
+            return left / right
+        except ZeroDivisionError:
+            raise Exception("Ділення на нуль")
 
     def visit_BinOp(self, node):
         # Обчислення операцій додавання, віднімання, множення та ділення
-        if node.op.type == TokenType.PLUS:
-            return self.visit(node.left) + self.visit(node.right)
-        elif node.op.type == TokenType.MINUS:
-            return self.visit(node.left) - self.visit(node.right)
-        elif node.op.type == TokenType.MUL:
-            return self.visit(node.left) * self.visit(node.right)
-        elif node.op.type == TokenType.DIV:
-            try:
-                return self.visit(node.left) / self.visit(node.right)
-            except ZeroDivisionError:
-                raise Exception("Ділення на нуль")
+        return self.operations[node.op.type](self.visit(node.left), self.visit(node.right))
 
     def visit_Num(self, node):
         # Повертає значення числового токена
         return node.value
 
+    def visit_Var(self, node):
+        # Повертає значення змінної з переданого словника
+        try:
+            return self.variables[node.name]
+        except KeyError:
+            raise Exception(f"Невизначена змінна: {node.name}")
+
     def interpret(self):
         # Запуск обробки виразу, побудова та обчислення синтаксичного дерева
         tree = self.parser.expr()
         return self.visit(tree)
 
     def visit(self, node):
-        # Динамічний виклик методу для обробки конкретного типу вузла AST
-        method_name = "visit_" + type(node).__name__
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        """
+        Обчислює дерево без рекурсії.
+
+        Вузли обходяться у зворотному польському порядку за допомогою явного стеку:
+        BinOp розгортається в (лівий операнд, правий операнд, оператор), а токен
+        оператора на стеку означає, що обидва його операнди вже обчислено.
+        """
+        visitors = self.visitors
+        operations = self.operations
+        stack = [node]
+        values = []  # Стек обчислених значень
+
+        while stack:
+            item = stack.pop()
+            node_class = type(item)
+            if node_class is BinOp:
+                stack.append(item.op)
+                stack.append(item.right)
+                stack.append(item.left)
+            elif node_class is Token:
+                right = values.pop()
+                values[-1] = operations[item.type](values[-1], right)
+            else:
+                visitor = visitors.get(node_class)
+                if visitor is None:
+                    # Невідомий клас вузла: шукаємо метод один раз і запам'ятовуємо його
+                    visitor = getattr(self, "visit_" + node_class.__name__, self.generic_visit)
+                    visitors[node_class] = visitor
+                values.append(visitor(item))
+
+        return values[0]
 
     def generic_visit(self, node):
         # Помилка, якщо не знайдено відповідного методу для вузла AST
         raise Exception(f"Метод відвідування не визначений: visit_{type(node).__name__}")
-    
+
 
 # Тестування роботи інтерпретатора на різних виразах
 def test_interpreter():
@@ -250,8 +443,9 @@ def test_interpreter():
         print(f"{expression} = {result}")
 
 
-# Тестування 
-test_interpreter()
+# Тестування (лише під час запуску як скрипта, щоб модуль можна було імпортувати)
+if __name__ == "__main__":
+    test_interpreter()
 
 """ 
 output:
@@ -0,0 +1,159 @@
+"""
+Векторизоване обчислення виразів з task2.py над стовпцями даних.
+
+Замість того, щоб обходити дерево окремо для кожного рядка, VectorInterpreter
+обходить його один раз, а кожен вузол BinOp виконує операцію над цілими
+стовпцями. Змінні прив'язуються до масивів NumPy, array.array або звичайних
+списків однакової довжини.
+
+Ділення на нуль не перериває обчислення всього пакета: відповідні елементи
+позначаються в масці помилок VectorResult.errors, а їхні значення стають NaN
+(для NumPy) або None (без NumPy).
+
+Якщо NumPy не встановлено, використовується повільніший запасний варіант на
+списках Python, який також обробляє кожен вузол цілим стовпцем.
+Зверніть увагу: цілочисельні масиви NumPy мають фіксовану розрядність, тож на
+відміну від чисел Python можуть переповнюватися.
+"""
+
+import array
+import operator
+
+from task2 import Interpreter, Lexer, Parser, TokenType
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необов'язкова залежність
+    np = None
+
+
+# Арифметичні операції над стовпцями (крім ділення, що обробляється окремо)
+_OPERATIONS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+}
+
+
+class VectorResult:
+    """
+    Результат векторизованого обчислення.
+
+    values - значення для кожного рядка, errors - маска рядків, у яких сталося ділення на нуль.
+    """
+
+    def __init__(self, values, errors):
+        self.values = values
+        self.errors = errors
+
+    def error_rows(self):
+        # Індекси рядків, для яких обчислення завершилося діленням на нуль
+        return [index for index, failed in enumerate(self.errors) if failed]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class VectorInterpreter(Interpreter):
+    """
+    Інтерпретатор, що обчислює вираз одразу для всіх рядків стовпців.
+
+    Кожен вузол обчислюється в пару (значення, маска помилок); для констант це скаляри,
+    які транслюються (broadcast) на всю довжину стовпців. Обхід дерева успадковано
+    від Interpreter, тут замінено лише листки та таблицю операцій.
+    """
+
+    def __init__(self, parser, columns, use_numpy=None):
+        """
+        :param parser: Парсер виразу.
+        :param columns: Словник {ім'я змінної: стовпець значень}.
+        :param use_numpy: Примусово ввімкнути/вимкнути NumPy (за замовчуванням - якщо доступний).
+        """
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        if self.use_numpy and np is None:
+            raise ImportError("Для векторизованого режиму з use_numpy=True потрібен NumPy")
+
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Усі стовпці мають бути однакової довжини")
+        self.length = lengths.pop() if lengths else 1  # Кількість рядків
+
+        super().__init__(parser, {name: self._to_column(column) for name, column in columns.items()})
+
+    def _to_column(self, column):
+        # Перетворює стовпець на внутрішнє представлення без зайвого копіювання
+        if self.use_numpy:
+            if isinstance(column, array.array):
+                return np.frombuffer(column, dtype=column.typecode)  # Спільна пам'ять з array.array
+            return np.asarray(column)
+        return column if isinstance(column, list) else list(column)
+
+    def visit_Num(self, node):
+        return node.value, False
+
+    def visit_Var(self, node):
+        return super().visit_Var(node), False
+
+    def build_operations(self):
+        # Кожна операція отримує та повертає пари (значення, маска помилок)
+        binop = self._numpy_binop if self.use_numpy else self._list_binop
+        return {
+            op_type: (lambda left, right, op_type=op_type: binop(op_type, left, right))
+            for op_type in (TokenType.PLUS, TokenType.MINUS, TokenType.MUL, TokenType.DIV)
+        }
+
+    def _numpy_binop(self, op_type, left, right):
+        (left, left_errors), (right, right_errors) = left, right
+        errors = np.logical_or(left_errors, right_errors)
+        if op_type != TokenType.DIV:
+            return _OPERATIONS[op_type](left, right), errors
+
+        # Ділення виконується лише там, де знаменник ненульовий; решта елементів - NaN
+        zero = np.equal(right, 0)
+        left, right, zero = np.broadcast_arrays(left, right, zero)
+        values = np.full(left.shape, np.nan)
+        np.true_divide(left, right, out=values, where=~zero)
+        return values, np.logical_or(errors, zero)
+
+    def _list_binop(self, op_type, left, right):
+        # Запасний варіант без NumPy: None позначає елемент з помилкою, маска не потрібна
+        (left, _), (right, _) = left, right
+        left = left if isinstance(left, list) else [left] * self.length
+        right = right if isinstance(right, list) else [right] * self.length
+        if op_type == TokenType.DIV:
+            return [None if a is None or b is None or b == 0 else a / b for a, b in zip(left, right)], None
+        operation = _OPERATIONS[op_type]
+        return [None if a is None or b is None else operation(a, b) for a, b in zip(left, right)], None
+
+    def interpret(self):
+        # Обчислює вираз і приводить результат до стовпця повної довжини
+        values, errors = self.visit(self.parser.expr())
+        if self.use_numpy:
+            values = np.array(np.broadcast_to(values, (self.length,)))
+            errors = np.array(np.broadcast_to(errors, (self.length,)))
+            return VectorResult(values, errors)
+        if not isinstance(values, list):
+            values = [values] * self.length
+        return VectorResult(values, [value is None for value in values])
+
+
+def evaluate_columns(text, columns, use_numpy=None):
+    """
+    Обчислює вираз над стовпцями значень змінних.
+
+    :param text: Вихідний рядок виразу, наприклад "price * qty - discount".
+    :param columns: Словник {ім'я змінної: стовпець} (NumPy, array.array або список).
+    :return: VectorResult зі значеннями та маскою помилок ділення на нуль.
+    """
+    return VectorInterpreter(Parser(Lexer(text)), columns, use_numpy=use_numpy).interpret()
+
+
+# Демонстрація векторизованого обчислення
+if __name__ == "__main__":
+    columns = {
+        "price": array.array("d", [10.0, 20.0, 30.0, 40.0]),
+        "qty": array.array("l", [1, 2, 0, 4]),
+    }
+    result = evaluate_columns("price * qty + 100 / qty", columns)
+    print(f"Значення: {result.values}")
+    print(f"Рядки з діленням на нуль: {result.error_rows()}")
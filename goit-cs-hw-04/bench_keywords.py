@@ -0,0 +1,81 @@
+"""
+Масштабування підрахунку ключових слів зі зростанням їх кількості.
+
+Порівнюються SubstringMatcher (окремий str.count на кожне слово) та
+KeywordAutomaton (автомат Ахо-Корасік, один прохід по тексту) на синтетичному
+тексті для кількості слів від 2 до 10 000. Результати обох способів
+звіряються між собою.
+
+Запуск: python bench_keywords.py [--size 1000000] [--counts 2 10 100 1000 10000]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from keyword_search import DEFAULT_CHUNK_SIZE, KeywordAutomaton, SubstringMatcher
+
+
+def generate_text(size, vocabulary, seed=0):
+    # Текст із випадкових слів словника, розділених пробілами
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(vocabulary)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def generate_vocabulary(count, seed=1):
+    # Унікальні випадкові слова довжиною 3-10 літер
+    rng = random.Random(seed)
+    vocabulary = set()
+    while len(vocabulary) < count:
+        vocabulary.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return sorted(vocabulary)
+
+
+def scan(matcher, data, chunk_size):
+    # Прохід матчера по UTF-8 байтах тексту фрагментами, як під час читання файлу
+    scanner = matcher.scanner()
+    for start in range(0, len(data), chunk_size):
+        scanner.feed(data[start:start + chunk_size])
+    return scanner.result()
+
+
+def measure(function):
+    start_time = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start_time, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк str.count проти автомата Ахо-Корасік")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Розмір тексту в символах")
+    parser.add_argument("--counts", type=int, nargs="+", default=[2, 10, 100, 1000, 10000],
+                        help="Кількості ключових слів")
+    args = parser.parse_args()
+
+    vocabulary = generate_vocabulary(max(args.counts) * 2)
+    data = generate_text(args.size, vocabulary).encode("utf-8")  # Матчери шукають у сирих байтах
+    rng = random.Random(2)
+
+    print(f"Текст: {len(data)} байтів")
+    print(f"{'слів':>8} {'str.count, с':>13} {'автомат, с':>11} {'побудова, с':>12} {'прискорення':>12}")
+    for count in args.counts:
+        keywords = rng.sample(vocabulary, count)
+        substring_time, expected = measure(lambda: scan(SubstringMatcher(keywords), data, DEFAULT_CHUNK_SIZE))
+        build_time, automaton = measure(lambda: KeywordAutomaton(keywords))
+        automaton_time, result = measure(lambda: scan(automaton, data, DEFAULT_CHUNK_SIZE))
+        if result != expected:
+            raise RuntimeError("Результати str.count та автомата не збігаються")
+        total = build_time + automaton_time
+        print(f"{count:>8} {substring_time:>13.3f} {automaton_time:>11.3f} {build_time:>12.3f} "
+              f"{substring_time / total:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Відтворюваний бенчмарк рушіїв пошуку ключових слів.
+
+Генерує синтетичний корпус (кількість файлів, розподіл розмірів, частка
+ключових слів у тексті задаються параметрами) і запускає кожен рушій з
+різною кількістю виконавців. Кожен запуск виконується в окремому процесі,
+щоб піковий RSS і процесорний час не змішувалися між запусками. Результати
+всіх рушіїв звіряються між собою.
+
+Для кожного запуску в JSON записуються: час виконання, процесорний час
+(разом з дочірніми процесами), піковий RSS і пропускна здатність у МБ/с.
+
+Запуск: python bench_search.py [--files 20] [--size 1000000] [--distribution lognormal]
+        [--density 0.01] [--workers 1 2 4] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Спільні вимірювання RSS і процесорного часу лежать у корені репозиторію
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from bench_usage import cpu_seconds, peak_rss_bytes
+
+from bench_keywords import generate_vocabulary
+from keyword_index import KeywordIndex
+from task_multiprocessing import multiprocessing_search
+from task_threading import threaded_search
+
+MANIFEST = "corpus.json"  # Опис корпусу: файли, ключові слова, параметри генерації
+
+
+def run_indexed(files, keywords, workers, directory):
+    # Запит до вже побудованого індексу (побудова не входить у вимірюваний час)
+    with KeywordIndex(os.path.join(directory, "index.sqlite3")) as index:
+        return index.search(files, keywords, errors={})
+
+
+# Рушії пошуку: назва -> (функція, чи залежить від кількості виконавців)
+ENGINES = {
+    "threaded": (lambda files, keywords, workers, directory:
+                 threaded_search(files, keywords, num_threads=workers, errors={}), True),
+    "threaded-mmap": (lambda files, keywords, workers, directory:
+                      threaded_search(files, keywords, num_threads=workers, use_mmap=True, errors={}), True),
+    "multiprocessing": (lambda files, keywords, workers, directory:
+                        multiprocessing_search(files, keywords, num_processes=workers, errors={}), True),
+    "multiprocessing-mmap": (lambda files, keywords, workers, directory:
+                             multiprocessing_search(files, keywords, num_processes=workers, use_mmap=True,
+                                                    errors={}), True),
+    "indexed": (run_indexed, False),
+}
+
+
+def file_sizes(count, mean_size, distribution, rng):
+    """
+    Розміри файлів корпусу із середнім mean_size.
+
+    :param distribution: equal - однакові, uniform - рівномірно від 0 до 2 * mean_size,
+        lognormal - кілька великих файлів і багато малих.
+    """
+    if distribution == "equal":
+        return [mean_size] * count
+    if distribution == "uniform":
+        return [rng.randint(0, 2 * mean_size) for _ in range(count)]
+    if distribution == "lognormal":
+        sizes = [rng.lognormvariate(0, 1.5) for _ in range(count)]
+        scale = mean_size * count / sum(sizes)
+        return [int(size * scale) for size in sizes]
+    raise ValueError(f"Невідомий розподіл розмірів: {distribution}")
+
+
+def generate_corpus(directory, file_count=20, mean_size=1_000_000, distribution="lognormal", density=0.01,
+                    keyword_count=10, seed=0):
+    """
+    Генерує корпус текстових файлів і записує його опис у corpus.json.
+
+    :param directory: Каталог для файлів корпусу.
+    :param file_count: Кількість файлів.
+    :param mean_size: Середній розмір файлу в байтах.
+    :param distribution: Розподіл розмірів файлів (див. file_sizes).
+    :param density: Частка ключових слів серед слів тексту.
+    :param keyword_count: Кількість ключових слів.
+    :param seed: Початкове значення генератора випадкових чисел.
+    :return: Опис корпусу (словник manifest).
+    """
+    rng = random.Random(seed)
+    vocabulary = generate_vocabulary(keyword_count + 5000, seed=seed + 1)
+    keywords = rng.sample(vocabulary, keyword_count)
+    keyword_set = set(keywords)
+    filler = [word for word in vocabulary if word not in keyword_set]
+
+    files = []
+    for index, size in enumerate(file_sizes(file_count, mean_size, distribution, rng)):
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(keywords) if rng.random() < density else rng.choice(filler)
+            words.append(word)
+            length += len(word) + 1
+        file_path = os.path.join(directory, f"corpus_{index:04d}.txt")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(" ".join(words))
+        files.append(file_path)
+
+    manifest = {
+        "files": files,
+        "keywords": keywords,
+        "file_count": file_count,
+        "mean_size": mean_size,
+        "distribution": distribution,
+        "density": density,
+        "seed": seed,
+        "total_bytes": sum(os.path.getsize(file_path) for file_path in files),
+    }
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def run_engine(engine, workers, directory):
+    # Вимірювання всередині дочірнього процесу; результат - один рядок JSON у stdout
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    function, _ = ENGINES[engine]
+
+    start_times = os.times()
+    start_time = time.perf_counter()
+    results = function(manifest["files"], manifest["keywords"], workers, directory)
+    wall = time.perf_counter() - start_time
+    end_times = os.times()
+
+    cpu = cpu_seconds(start_times, end_times)  # Разом із процесами пулу
+    peak_rss = peak_rss_bytes(children=True)  # None, якщо виміряти неможливо
+    print(json.dumps({
+        "engine": engine,
+        "workers": workers,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "peak_rss_bytes": peak_rss,
+        "throughput_mb_s": manifest["total_bytes"] / wall / 1e6 if wall else None,
+        "results": results,
+    }, ensure_ascii=False))
+
+
+def prepare(directory, engines):
+    # Прогріває кеш сторінок і будує індекс до вимірювань, щоб усі запуски були в однакових умовах
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for file_path in manifest["files"]:
+        with open(file_path, "rb") as f:
+            while f.read(1 << 20):
+                pass
+    if "indexed" in engines:
+        start_time = time.perf_counter()
+        with KeywordIndex(os.path.join(directory, "index.sqlite3")) as index:
+            index.update(manifest["files"])
+        return {"index_build_seconds": time.perf_counter() - start_time}
+    return {}
+
+
+def benchmark(directory, engines, worker_counts, repeat=1):
+    """
+    Запускає всі рушії з усіма кількостями виконавців і звіряє результати.
+
+    :return: Список вимірювань (для кожного запуску - окремий запис).
+    """
+    measurements = []
+    expected = None
+    for engine in engines:
+        _, uses_workers = ENGINES[engine]
+        for workers in worker_counts if uses_workers else [1]:
+            for attempt in range(repeat):
+                output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", engine,
+                                         "--workers", str(workers), "--directory", directory],
+                                        check=True, capture_output=True, text=True).stdout
+                measurement = json.loads(output)
+                results = measurement.pop("results")
+                if expected is None:
+                    expected = results
+                elif results != expected:
+                    raise Exception(f"Результати рушія {engine} ({workers} виконавців) відрізняються від інших")
+                measurement["attempt"] = attempt
+                measurement["matches"] = sum(data["count"] for data in results.values())
+                measurements.append(measurement)
+                print(f"{engine:>21} x{workers:<3} {measurement['wall_seconds']:8.3f} с "
+                      f"{measurement['throughput_mb_s']:9.1f} МБ/с", file=sys.stderr)
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк рушіїв пошуку ключових слів")
+    parser.add_argument("--files", type=int, default=20, help="Кількість файлів корпусу")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Середній розмір файлу в байтах")
+    parser.add_argument("--distribution", choices=("equal", "uniform", "lognormal"), default="lognormal",
+                        help="Розподіл розмірів файлів")
+    parser.add_argument("--density", type=float, default=0.01, help="Частка ключових слів серед слів тексту")
+    parser.add_argument("--keywords", type=int, default=10, help="Кількість ключових слів")
+    parser.add_argument("--seed", type=int, default=0, help="Початкове значення генератора")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES), help="Рушії пошуку")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Кількості виконавців")
+    parser.add_argument("--repeat", type=int, default=1, help="Кількість повторів кожного запуску")
+    parser.add_argument("--directory", help="Каталог корпусу (за замовчуванням - тимчасовий)")
+    parser.add_argument("--output", help="Файл для JSON-звіту (за замовчуванням - stdout)")
+    parser.add_argument("--run", help=argparse.SUPPRESS)  # Внутрішній режим дочірнього процесу
+    args = parser.parse_args()
+
+    if args.run:
+        run_engine(args.run, args.workers[0], args.directory)
+        return
+
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = args.directory or temporary
+        os.makedirs(directory, exist_ok=True)
+        manifest = generate_corpus(directory, args.files, args.size, args.distribution, args.density,
+                                   args.keywords, args.seed)
+        setup = prepare(directory, args.engines)
+        report = {
+            "corpus": {key: value for key, value in manifest.items() if key != "files"},
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "setup": setup,
+            "measurements": benchmark(directory, args.engines, args.workers, args.repeat),
+        }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
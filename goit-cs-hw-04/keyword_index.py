@@ -0,0 +1,323 @@
+"""
+Постійний інвертований індекс для повторних пошуків ключових слів у тому самому корпусі.
+
+Кожен файл один раз розбивається на слова (послідовності символів \\w), і в
+базі SQLite зберігаються списки входжень: скільки разів кожне слово зустрічається
+в кожному файлі. Під час наступних запусків файл переіндексовується лише тоді,
+коли змінилися його розмір або час зміни, а вміст (SHA-256) справді інший.
+
+Результат пошуку збігається з threaded_search/multiprocessing_search, тобто з
+content.count(word). Ключове слово, що складається лише з символів \\w, не може
+перетинати межу між словами тексту, тож кількість його входжень у файлі - це
+сума token.count(keyword) по всіх словах файлу з урахуванням їх кратності.
+Такі запити виконуються по словнику індексу без читання файлів. Решта слів
+(з пробілами, розділовими знаками, порожнє слово рахується за кількістю символів)
+шукається скануванням файлів через keyword_search.
+
+Запуск: python keyword_index.py [--index keyword_index.sqlite3] --keywords CDE QWERTY -- *.txt
+"""
+
+import argparse
+import codecs
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+
+from keyword_search import DEFAULT_CHUNK_SIZE, build_matcher, collect_results, count_keywords_in_file
+
+DEFAULT_INDEX_PATH = "keyword_index.sqlite3"
+
+_WORD = re.compile(r"\w+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    characters INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY,
+    token TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (token_id, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+def is_indexable(keyword):
+    # Чи можна відповісти на запит зі словника: слово не порожнє і складається лише з символів \w
+    return _WORD.fullmatch(keyword) is not None
+
+
+def tokenize_file(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Розбиває файл на слова, читаючи його фрагментами.
+
+    :param file_path: Шлях до файлу.
+    :param chunk_size: Розмір фрагмента в байтах.
+    :return: Трійка (Counter слів, кількість символів, SHA-256 вмісту).
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    digest = hashlib.sha256()
+    tokens = Counter()
+    characters = 0
+    carry = ""  # Незавершене слово з кінця попереднього фрагмента
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            text = carry + decoder.decode(chunk, final=not chunk)  # Кидає UnicodeDecodeError
+            characters += len(text) - len(carry)
+            digest.update(chunk)
+            if not chunk:
+                break
+            words = _WORD.findall(text)
+            # Слово в кінці фрагмента може продовжуватися в наступному
+            carry = words.pop() if words and _WORD.match(text, len(text) - 1) else ""
+            tokens.update(words)
+
+    tokens.update(_WORD.findall(text))
+    return tokens, characters, digest.hexdigest()
+
+
+def file_digest(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    # SHA-256 вмісту файлу для перевірки, чи справді він змінився
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class KeywordIndex:
+    """
+    Інвертований індекс корпусу файлів у базі SQLite.
+    """
+
+    def __init__(self, index_path=DEFAULT_INDEX_PATH, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        :param index_path: Шлях до файлу бази (":memory:" - індекс лише в пам'яті).
+        :param chunk_size: Розмір фрагмента для читання файлів.
+        """
+        self.chunk_size = chunk_size
+        self._token_ids = None  # Кеш словника індексу для індексації
+        self.connection = sqlite3.connect(index_path)
+        self.connection.executescript(_SCHEMA)
+        # Кількість неперекривних входжень ключового слова в слово словника
+        self.connection.create_function("occurrences", 2, lambda token, keyword: token.count(keyword),
+                                        deterministic=True)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, files):
+        """
+        Приводить індекс у відповідність до файлів на диску.
+
+        Файл переіндексовується, якщо він новий або змінилися його розмір чи час
+        зміни і при цьому змінився вміст. Записи про файли, яких більше немає на
+        диску, видаляються. Кожен файл оновлюється окремою транзакцією, тож
+        перерване оновлення продовжується з того ж місця.
+
+        :param files: Список файлів корпусу.
+        :return: Словник зі статистикою: added, updated, unchanged, removed.
+        """
+        stats = dict.fromkeys(("added", "updated", "unchanged", "removed"), 0)
+        known = {path: (file_id, size, mtime_ns, digest)
+                 for file_id, path, size, mtime_ns, digest
+                 in self.connection.execute("SELECT id, path, size, mtime_ns, digest FROM files")}
+
+        for file_path in dict.fromkeys(os.path.abspath(path) for path in files):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue  # Відсутній файл буде видалено нижче, а помилку повідомить пошук
+            entry = known.get(file_path)
+            if entry is not None and (entry[1], entry[2]) == (stat.st_size, stat.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+            if entry is not None and file_digest(file_path, self.chunk_size) == entry[3]:
+                # Вміст той самий (наприклад, файл лише "торкнули") - оновлюємо тільки метадані
+                with self.connection:
+                    self.connection.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                            (stat.st_size, stat.st_mtime_ns, entry[0]))
+                stats["unchanged"] += 1
+                continue
+            self._index_file(file_path, stat)
+            stats["updated" if entry is not None else "added"] += 1
+
+        for file_path, (file_id, *_) in known.items():
+            if not os.path.exists(file_path):
+                with self.connection:
+                    self.connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                    self.connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                stats["removed"] += 1
+        return stats
+
+    def _index_file(self, file_path, stat):
+        # Переіндексовує один файл; помилка читання чи кодування зберігається замість слів
+        try:
+            tokens, characters, digest = tokenize_file(file_path, self.chunk_size)
+            error = None
+        except (OSError, UnicodeDecodeError) as e:
+            tokens, characters, digest, error = Counter(), 0, "", str(e)
+
+        token_ids = self._load_token_ids()
+        new_tokens = [token for token in tokens if token not in token_ids]
+        try:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO files (path, size, mtime_ns, digest, characters, error) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                    "digest = excluded.digest, characters = excluded.characters, error = excluded.error "
+                    "RETURNING id",
+                    (file_path, stat.st_size, stat.st_mtime_ns, digest, characters, error))
+                file_id = cursor.fetchone()[0]
+                self.connection.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                # Слова з таблиці не видаляються, тож нові отримують наступні за порядком id
+                # і їх не треба шукати в таблиці після вставки
+                for token_id, token in enumerate(new_tokens, len(token_ids) + 1):
+                    token_ids[token] = token_id
+                self.connection.executemany("INSERT INTO tokens (id, token) VALUES (?, ?)",
+                                            ((token_ids[token], token) for token in new_tokens))
+                self.connection.executemany("INSERT INTO postings (token_id, file_id, count) VALUES (?, ?, ?)",
+                                            sorted((token_ids[token], file_id, count)
+                                                   for token, count in tokens.items()))
+        except BaseException:
+            self._token_ids = None  # Транзакцію відкочено - кеш id слів більше не відповідає базі
+            raise
+
+    def _load_token_ids(self):
+        # Словник слово -> id завантажується з бази один раз і далі доповнюється під час індексації
+        if self._token_ids is None:
+            self._token_ids = dict(self.connection.execute("SELECT token, id FROM tokens"))
+        return self._token_ids
+
+    def count(self, keyword):
+        """
+        Рахує входження слова з символів \\w у кожному проіндексованому файлі.
+
+        :return: Словник {id файлу: кількість входжень} (файли без входжень відсутні).
+        """
+        return dict(self.connection.execute(
+            "SELECT p.file_id, SUM(p.count * occurrences(t.token, ?1)) "
+            "FROM tokens t CROSS JOIN postings p ON p.token_id = t.id "
+            "WHERE instr(t.token, ?1) > 0 GROUP BY p.file_id",
+            (keyword,)))
+
+    def search(self, files, keywords, errors=None, update=True):
+        """
+        Пошук ключових слів у файлах з використанням індексу.
+
+        :param files: Список файлів для обробки.
+        :param keywords: Список ключових слів для пошуку.
+        :param errors: Словник, у який записуються помилки {файл: опис} (якщо не задано, помилки виводяться).
+        :param update: Чи оновлювати індекс перед пошуком.
+        :return: Словник результатів пошуку, як у threaded_search.
+        """
+        if update:
+            self.update(files)
+        entries = {path: (file_id, characters, error)
+                   for file_id, path, characters, error
+                   in self.connection.execute("SELECT id, path, characters, error FROM files")}
+
+        file_counts = {}  # Підсумкові лічильники по файлах
+        failed = {}  # Помилки по файлах
+        ids = {}  # id файлу в індексі -> шлях, як його передав викликач
+        for file_path in files:
+            entry = entries.get(os.path.abspath(file_path))
+            if entry is None:
+                failed[file_path] = f"Файл відсутній в індексі: {file_path}"
+            elif entry[2] is not None:
+                failed[file_path] = entry[2]
+            else:
+                ids[entry[0]] = file_path
+                file_counts[file_path] = {word: entry[1] + 1 if word == "" else 0 for word in keywords}
+
+        unique = list(dict.fromkeys(keywords))
+        for word in unique:
+            if is_indexable(word):
+                for file_id, count in self.count(word).items():
+                    if file_id in ids:
+                        file_counts[ids[file_id]][word] = count
+
+        # Слова, на які словник не відповідає, шукаються скануванням файлів
+        scanned = [word for word in unique if word and not is_indexable(word)]
+        if scanned:
+            matcher = build_matcher(scanned)
+            for file_path in list(file_counts):
+                try:
+                    file_counts[file_path].update(count_keywords_in_file(file_path, matcher, self.chunk_size))
+                except Exception as e:
+                    failed[file_path] = str(e)
+
+        if errors is not None:
+            errors.update(failed)  # Помилки повертаються викликачу по кожному файлу
+        else:
+            for file_path, error in failed.items():
+                # Обробка винятків при обробці файлу
+                print(f"Помилка при обробці файлу {file_path}: {error}")
+
+        return collect_results(files, keywords, file_counts, failed)
+
+
+def indexed_search(files, keywords, index_path=DEFAULT_INDEX_PATH, errors=None):
+    """
+    Функція для пошуку з постійним індексом: оновлює індекс і виконує запит.
+
+    :param files: Список файлів для обробки.
+    :param keywords: Список ключових слів для пошуку.
+    :param index_path: Шлях до файлу індексу.
+    :param errors: Словник для помилок по файлах (якщо не задано, помилки виводяться).
+    :return: Словник результатів пошуку.
+    """
+    with KeywordIndex(index_path) as index:
+        return index.search(files, keywords, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пошук ключових слів з постійним інвертованим індексом")
+    parser.add_argument("files", nargs="+", help="Файли корпусу")
+    parser.add_argument("--keywords", nargs="+", required=True, help="Ключові слова для пошуку")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Шлях до файлу індексу")
+    args = parser.parse_args()
+
+    with KeywordIndex(args.index) as index:
+        start_time = time.perf_counter()
+        stats = index.update(args.files)
+        update_time = time.perf_counter() - start_time
+
+        errors = {}
+        start_time = time.perf_counter()
+        results = index.search(args.files, args.keywords, errors, update=False)
+        search_time = time.perf_counter() - start_time
+
+    print(f"Оновлення індексу: {stats} за {update_time:.3f} с")
+    print("Результати пошуку за індексом:")
+    for word, data in results.items():
+        print(f"{word}: {data['files']} (Знайдено слів: {data['count']})")
+    for file_path, error in errors.items():
+        print(f"Помилка при обробці файлу {file_path}: {error}")
+    print(f"Час запиту: {search_time * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,686 @@
+"""
+Спільні функції пошуку ключових слів для task_threading.py та task_multiprocessing.py.
+
+Файл читається фрагментами фіксованого розміру, тож пам'ять не залежить від
+розміру файлу. Результат збігається з content.count(word) для всього вмісту:
+рахуються неперекривні входження зліва направо, включно з тими, що
+перетинають межу між фрагментами.
+
+Є два способи підрахунку з однаковим результатом:
+- SubstringMatcher - окремий str.count для кожного слова (швидко для кількох слів);
+- KeywordAutomaton - автомат Ахо-Корасік, що знаходить усі слова за один прохід
+  по тексту (вигідно для сотень і тисяч слів).
+Для пошуку цілих слів, без урахування регістру та за регулярними виразами є
+PatternMatcher: один скомпільований вираз для всіх слів, що проходить
+декодований текст і може запам'ятовувати позиції збігів.
+build_matcher() обирає спосіб за кількістю слів і режимом пошуку. Матчер будується один раз на
+пошук і спільно використовується всіма потоками та процесами, а для кожного
+файлу створюється окремий легкий сканер зі своїм станом.
+
+Пошук ведеться по сирих байтах UTF-8 (закодовані ключові слова в коректному
+UTF-8 тексті збігаються рівно там, де й рядкові), а коректність кодування
+перевіряється інкрементним декодером. Це дозволяє ділити великі файли на
+діапазони байтів (plan_work) і обробляти їх незалежно різними виконавцями.
+У режимі use_mmap файл відображається в пам'ять і виконавець сканує його сам,
+без читання у фрагменти: автомат проходить відображення через memoryview без
+копіювання, а SubstringMatcher - зрізами розміром з вікно.
+На відміну від текстового режиму open(), послідовності "\r\n" не
+перетворюються на "\n", що важливо лише для ключових слів із символами
+кінця рядка.
+"""
+
+import codecs
+import mmap
+import os
+import re
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # Розмір фрагмента за замовчуванням (у байтах)
+
+# Мінімальний розмір діапазону, на які діляться великі файли
+DEFAULT_SPLIT_SIZE = 32 << 20
+
+# Починаючи з цієї кількості слів, автомат швидший за окремі str.count (див. bench_keywords.py)
+AUTOMATON_THRESHOLD = 150
+
+
+def _has_border(word):
+    # Чи може слово перекриватися саме з собою ("aa", "abab"): префікс збігається з суфіксом
+    return any(word[:size] == word[-size:] for size in range(1, len(word)))
+
+
+class StreamingCounter:
+    """
+    Потоковий підрахунок входжень ключових слів з семантикою str.count.
+    """
+
+    def __init__(self, keywords, keys=None):
+        """
+        :param keywords: Шукані слова (str або bytes, того ж типу, що й фрагменти).
+        :param keys: Ключі результату для кожного слова (за замовчуванням - самі слова).
+        """
+        self.keywords = list(dict.fromkeys(keywords))  # Унікальні слова в початковому порядку
+        self.keys = list(keys) if keys is not None else self.keywords
+        self.counts = {word: 0 for word in self.keywords}
+        self.length = 0  # Кількість уже оброблених символів
+        self._tails = dict.fromkeys(self.keywords)  # Кінець попередніх даних, з якого може початися збіг
+        self._overlapping = {word: _has_border(word) for word in self.keywords}
+
+    def feed(self, chunk):
+        # Обробляє черговий фрагмент тексту
+        for word in self.keywords:
+            size = len(word)
+            if size == 0:
+                continue  # Порожнє слово враховується в result()
+            tail = self._tails[word]
+            if tail is None:
+                tail = chunk[:0]  # Порожній рядок того ж типу, що й фрагменти (str або bytes)
+
+            if self._overlapping[word]:
+                self._feed_overlapping(word, tail + chunk)
+                continue
+
+            # Слово не може перекриватися саме з собою, тож входження незалежні:
+            # рахуємо ті, що цілком у фрагменті, і ті, що перетинають межу з попереднім
+            self.counts[word] += chunk.count(word) + (tail + chunk[:size - 1]).count(word)
+            if size == 1:
+                self._tails[word] = chunk[:0]
+            elif len(chunk) >= size - 1:
+                self._tails[word] = chunk[-(size - 1):]
+            else:
+                self._tails[word] = (tail + chunk)[-(size - 1):]
+        self.length += len(chunk)
+
+    def _feed_overlapping(self, word, buffer):
+        # Жадібний пошук зліва направо, як у str.count, із запам'ятовуванням кінця останнього збігу
+        size = len(word)
+        last_end = 0
+        position = buffer.find(word)
+        while position != -1:
+            self.counts[word] += 1
+            last_end = position + size
+            position = buffer.find(word, last_end)
+        # Новий збіг може початися не раніше кінця попереднього і має зачепити наступний фрагмент
+        self._tails[word] = buffer[max(last_end, len(buffer) - size + 1):]
+
+    def result(self):
+        # Підсумкові лічильники; порожнє слово, як і в str.count, "входить" length + 1 разів
+        return {key: self.length + 1 if not word else self.counts[word]
+                for key, word in zip(self.keys, self.keywords)}
+
+
+class Matcher:
+    """
+    Базовий клас матчерів: ключові слова та їхні UTF-8 байтові шаблони.
+    """
+
+    zero_copy = True  # Чи може сканер приймати вікна memoryview замість bytes
+    binary = True  # Сканер приймає сирі байти (False - декодований текст)
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))  # Унікальні слова в початковому порядку
+        self.patterns = [word.encode('utf-8') for word in self.keywords]  # Шаблони для пошуку в байтах
+        self.max_length = max((len(pattern) for pattern in self.patterns), default=0)
+        # Файл можна ділити на діапазони, лише якщо входження слів незалежні одне від одного:
+        # слово не порожнє і не перекривається саме з собою
+        self.splittable = all(pattern and not _has_border(pattern) for pattern in self.patterns)
+
+    def scanner(self):
+        raise NotImplementedError
+
+    def count_buffer(self, buffer, start, end, window=DEFAULT_CHUNK_SIZE):
+        """
+        Рахує входження, що починаються в діапазоні [start, end) буфера (bytes або mmap).
+
+        Сканер проходить буфер вікнами; якщо він приймає memoryview (zero_copy),
+        дані не копіюються зовсім. Збіги, що виходять за end, дораховуються по
+        кількох байтах за межею.
+        """
+        scanner = self.scanner()
+        with memoryview(buffer) as view:
+            source = view if self.zero_copy else buffer
+            for position in range(start, end, window):
+                scanner.feed(source[position:min(position + window, end)])
+        counts = scanner.result()
+        overlap = max(self.max_length - 1, 0)
+        if end < len(buffer) and overlap:
+            crossing = count_crossing(self, buffer[max(start, end - overlap):end], buffer[end:end + overlap])
+            for key, found in crossing.items():
+                counts[key] += found
+        return counts
+
+
+class SubstringMatcher(Matcher):
+    """
+    Матчер, що рахує кожне слово окремим bytes.count.
+    """
+
+    # bytes.count не приймає memoryview, тож вікна копіюються зрізами: одночасно
+    # існує лише одна копія розміром з вікно, і вона не декодується
+    zero_copy = False
+
+    def scanner(self):
+        return StreamingCounter(self.patterns, self.keywords)
+
+
+class KeywordAutomaton(Matcher):
+    """
+    Автомат Ахо-Корасік для одночасного пошуку всіх ключових слів.
+
+    Переходи детермінованого автомата обчислюються ліниво: перехід, якого ще
+    немає в таблиці, знаходиться за посиланнями невдачі й запам'ятовується, тож
+    таблиця містить лише переходи, що реально зустрілися в тексті.
+    """
+
+    def __init__(self, keywords):
+        super().__init__(keywords)
+        self.transitions = [{}]  # Переходи для кожного стану (лінивий ДСА)
+        self.fail = [0]  # Посилання невдачі
+        self.outputs = [()]  # Слова, що закінчуються в стані: пари (індекс слова, довжина)
+        goto = [{}]  # Ребра бора (префіксного дерева)
+
+        for index, word in enumerate(self.patterns):
+            if not word:
+                continue  # Порожнє слово рахує StreamingCounter-семантика в result()
+            state = 0
+            for symbol in word:
+                next_state = goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][symbol] = next_state
+                    goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                    self.transitions.append({})
+                state = next_state
+            self.outputs[state] += ((index, len(word)),)
+
+        # Посилання невдачі обчислюються обходом бора в ширину
+        queue = list(goto[0].values())
+        for state in queue:
+            for symbol, child in goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and symbol not in goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = goto[fallback].get(symbol, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] += self.outputs[self.fail[child]]
+
+        for state, edges in enumerate(goto):
+            self.transitions[state].update(edges)
+        self._goto = goto
+
+    def transition(self, state, symbol):
+        # Обчислює відсутній перехід за посиланнями невдачі та кешує його
+        origin = state
+        while state and symbol not in self._goto[state]:
+            state = self.fail[state]
+        target = self._goto[state].get(symbol, 0)
+        self.transitions[origin][symbol] = target
+        return target
+
+    def scanner(self):
+        return AutomatonScanner(self)
+
+
+class AutomatonScanner:
+    """
+    Стан проходу автомата по одному файлу; результат збігається з StreamingCounter.
+    """
+
+    def __init__(self, automaton):
+        self.automaton = automaton
+        self.state = 0
+        self.position = 0  # Кількість уже оброблених символів
+        self.counts = [0] * len(automaton.keywords)
+        self.last_end = [0] * len(automaton.keywords)  # Кінець останнього зарахованого збігу слова
+
+    def feed(self, chunk):
+        automaton = self.automaton
+        transitions = automaton.transitions
+        outputs = automaton.outputs
+        counts = self.counts
+        last_end = self.last_end
+        state = self.state
+
+        for position, symbol in enumerate(chunk, self.position + 1):
+            next_state = transitions[state].get(symbol)
+            if next_state is None:
+                next_state = automaton.transition(state, symbol)
+            state = next_state
+            if outputs[state]:
+                # Збіги одного слова приходять у порядку зростання початку, тож
+                # жадібний вибір неперекривних збігів дає той самий результат, що й str.count
+                for index, size in outputs[state]:
+                    if position - size >= last_end[index]:
+                        counts[index] += 1
+                        last_end[index] = position
+
+        self.state = state
+        self.position += len(chunk)
+
+    def result(self):
+        return {word: self.position + 1 if not word else count
+                for word, count in zip(self.automaton.keywords, self.counts)}
+
+
+class PatternMatcher(Matcher):
+    """
+    Пошук цілих слів, без урахування регістру або за регулярними виразами.
+
+    Усі ключові слова компілюються в один регулярний вираз-альтернативу з
+    іменованою групою для кожного слова, тож текст проходиться один раз, а
+    скомпільований вираз спільний для всіх потоків (у процеси він передається
+    разом з матчером і компілюється там один раз). Кожен фрагмент тексту
+    зараховується лише одному слову: з кількох слів, що збігаються в одній
+    позиції, обирається найдовше (для регулярних виразів - перше в списку).
+    """
+
+    binary = False
+
+    def __init__(self, keywords, whole_word=False, ignore_case=False, regex=False):
+        """
+        :param keywords: Список ключових слів або регулярних виразів.
+        :param whole_word: Рахувати лише входження, не оточені символами слова (\\w).
+        :param ignore_case: Не враховувати регістр.
+        :param regex: Ключові слова - регулярні вирази (нумеровані зворотні посилання не підтримуються).
+        """
+        super().__init__(keywords)
+        self.splittable = False  # Файл сканується цілком одним виконавцем
+        if "" in self.keywords:
+            raise ValueError("Порожнє ключове слово не підтримується в режимах шаблонів")
+        flags = re.IGNORECASE if ignore_case else 0
+
+        bodies = []
+        for keyword in self.keywords:
+            body = keyword if regex else re.escape(keyword)
+            try:
+                re.compile(body, flags)
+            except re.error as e:
+                raise ValueError(f"Некоректний регулярний вираз {keyword!r}: {e}")
+            bodies.append(body)
+        order = range(len(self.keywords))
+        if not regex:
+            order = sorted(order, key=lambda index: -len(self.keywords[index]))  # Довші слова мають пріоритет
+        alternation = "|".join(f"(?P<_k{index}>{bodies[index]})" for index in order)
+        if whole_word:
+            alternation = rf"(?<!\w)(?:{alternation})(?!\w)"
+        self.pattern = re.compile(alternation, flags)
+        # Для звичайних слів відома максимальна довжина збігу, і текст можна сканувати потоково;
+        # довжина збігу регулярного виразу не обмежена, тож файл сканується цілком
+        self.max_length = None if regex else max(len(keyword) for keyword in self.keywords)
+
+    def scanner(self, offsets=False):
+        return PatternScanner(self, offsets)
+
+
+class PatternScanner:
+    """
+    Стан проходу PatternMatcher по декодованому тексту одного файлу.
+    """
+
+    def __init__(self, matcher, offsets=False):
+        """
+        :param matcher: PatternMatcher.
+        :param offsets: Чи запам'ятовувати позиції збігів (номер рядка, позиція в рядку).
+        """
+        self.matcher = matcher
+        self.counts = [0] * len(matcher.keywords)
+        self.offsets = [[] for _ in matcher.keywords] if offsets else None
+        self.buffer = ""  # Ще не просканований текст (з одним символом контексту для (?<!\w))
+        self.pieces = []  # Шматки тексту для регулярних виразів, які склеюються один раз наприкінці
+        self.position = 0  # Звідки продовжувати пошук у buffer
+        self.base = 0  # Позиція buffer[0] у файлі (у символах)
+        self.line = 1  # Номер рядка в позиції cursor
+        self.cursor = 0  # До якої позиції файлу пораховано кінці рядків
+        self.line_start = 0  # Позиція початку поточного рядка у файлі
+        self.characters = 0
+
+    def _advance(self, index):
+        # Переносить лічильник рядків до позиції buffer[index]
+        start = self.cursor - self.base
+        newlines = self.buffer.count("\n", start, index)
+        if newlines:
+            self.line += newlines
+            self.line_start = self.base + self.buffer.rfind("\n", start, index) + 1
+        self.cursor = self.base + index
+
+    def feed(self, text, final=False):
+        self.characters += len(text)
+        max_length = self.matcher.max_length
+        if max_length is None:
+            # Регулярні вирази шукаються лише у всьому тексті; += копіював би буфер на кожному шматку
+            self.pieces.append(text)
+            if not final:
+                return
+            text = "".join(self.pieces)
+            self.pieces = []
+        self.buffer += text
+        buffer = self.buffer
+        # Збіг, що починається до limit, разом із символом після нього вже повністю в буфері
+        if final:
+            limit = len(buffer)
+        else:
+            limit = len(buffer) - max_length - 1
+            if limit <= self.position:
+                return
+
+        resume = self.position
+        for match in self.matcher.pattern.finditer(buffer, self.position):
+            if match.start() >= limit and not final:
+                break
+            index = int(match.lastgroup[2:])
+            self.counts[index] += 1
+            if self.offsets is not None:
+                self._advance(match.start())
+                self.offsets[index].append((self.line, self.base + match.start() - self.line_start))
+            resume = match.end()
+        if final:
+            self.buffer = ""
+            return
+
+        # Відкидаємо просканований текст, лишаючи один символ контексту
+        resume = max(resume, limit)
+        if self.offsets is not None and self.cursor < self.base + resume - 1:
+            self._advance(resume - 1)
+        self.buffer = buffer[resume - 1:]
+        self.base += resume - 1
+        self.position = 1
+
+    def close(self):
+        self.feed("", final=True)
+
+    def result(self):
+        return dict(zip(self.matcher.keywords, self.counts))
+
+    def match_offsets(self):
+        # Позиції збігів {слово: [(номер рядка, позиція в рядку), ...]}
+        return dict(zip(self.matcher.keywords, self.offsets or ()))
+
+
+def build_matcher(keywords, whole_word=False, ignore_case=False, regex=False, offsets=False):
+    """
+    Обирає спосіб підрахунку за кількістю ключових слів і режимом пошуку.
+
+    :param keywords: Список ключових слів (рядків).
+    :param whole_word: Рахувати лише цілі слова.
+    :param ignore_case: Не враховувати регістр.
+    :param regex: Ключові слова - регулярні вирази.
+    :param offsets: Чи потрібні позиції збігів (їх знаходить лише PatternMatcher).
+    :return: SubstringMatcher, KeywordAutomaton або PatternMatcher.
+    """
+    if whole_word or ignore_case or regex or offsets:
+        return PatternMatcher(keywords, whole_word, ignore_case, regex)
+    if len(set(keywords)) >= AUTOMATON_THRESHOLD:
+        return KeywordAutomaton(keywords)
+    return SubstringMatcher(keywords)
+
+
+class Utf8Validator:
+    """
+    Перевіряє, що потік байтів є коректним UTF-8, і рахує кількість символів.
+
+    Декодований текст одразу відкидається; суто ASCII-фрагменти не декодуються взагалі.
+    """
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.characters = 0
+
+    def feed(self, chunk, final=False):
+        # Кидає UnicodeDecodeError, як і читання файлу в текстовому режимі
+        if chunk.isascii() and not self.decoder.getstate()[0]:
+            self.characters += len(chunk)
+            if final:
+                self.decoder.decode(b"", final=True)
+        else:
+            self.characters += len(self.decoder.decode(chunk, final=final))
+
+    def close(self):
+        self.feed(b"", final=True)
+
+
+def count_characters(buffer, start, end, window=DEFAULT_CHUNK_SIZE):
+    """
+    Перевіряє UTF-8 у діапазоні [start, end) буфера і повертає кількість символів.
+
+    Вікна беруться зрізами по одному, тож копія існує лише для поточного вікна;
+    суто ASCII-вікна не декодуються.
+    """
+    validator = Utf8Validator()
+    for position in range(start, end, window):
+        validator.feed(buffer[position:min(position + window, end)])
+    validator.close()
+    return validator.characters
+
+
+def count_crossing(matcher, before, after):
+    """
+    Рахує входження, що починаються в before і закінчуються в after (для слів без самоперекриття).
+    """
+    buffer = before + after
+    split = len(before)
+    counts = {}
+    for key, pattern in zip(matcher.keywords, matcher.patterns):
+        found = 0
+        position = buffer.find(pattern, max(0, split - len(pattern) + 1))
+        while position != -1 and position < split:
+            if position + len(pattern) > split:
+                found += 1
+            position = buffer.find(pattern, position + 1)
+        counts[key] = found
+    return counts
+
+
+def count_patterns_in_file(file_path, matcher, chunk_size=DEFAULT_CHUNK_SIZE, offsets=None):
+    """
+    Рахує збіги PatternMatcher у файлі, декодуючи його фрагментами.
+
+    :param file_path: Шлях до файлу.
+    :param matcher: PatternMatcher.
+    :param chunk_size: Розмір фрагмента в байтах (None - прочитати файл цілком).
+    :param offsets: Словник, у який записуються позиції збігів {слово: [(рядок, позиція в рядку), ...]}.
+    :return: Словник {слово: кількість збігів}.
+    """
+    scanner = matcher.scanner(offsets is not None)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(-1 if chunk_size is None else chunk_size):
+            scanner.feed(decoder.decode(chunk))  # Кидає UnicodeDecodeError
+    scanner.feed(decoder.decode(b"", final=True), final=True)
+    if offsets is not None:
+        offsets.update(scanner.match_offsets())
+    return scanner.result()
+
+
+def count_keywords_in_range(file_path, matcher, start=0, end=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                            use_mmap=False, offsets=None):
+    """
+    Рахує входження ключових слів, що починаються в діапазоні байтів [start, end) файлу.
+
+    :param file_path: Шлях до файлу.
+    :param matcher: Матчер з build_matcher().
+    :param start: Початок діапазону (має бути на межі символу UTF-8).
+    :param end: Кінець діапазону (None - до кінця файлу).
+    :param chunk_size: Розмір фрагмента в байтах (None - прочитати діапазон цілком).
+    :param use_mmap: Відобразити файл у пам'ять і сканувати його без читання фрагментами.
+    :param offsets: Словник для позицій збігів (лише для PatternMatcher, що сканує файл цілком).
+    :return: Словник {слово: кількість входжень}.
+    """
+    if not matcher.binary:
+        return count_patterns_in_file(file_path, matcher, chunk_size, offsets)
+    if use_mmap:
+        return count_keywords_mapped(file_path, matcher, start, end, chunk_size or DEFAULT_CHUNK_SIZE)
+
+    scanner = matcher.scanner()
+    validator = Utf8Validator()
+    overlap = max(matcher.max_length - 1, 0)
+    tail = b""  # Останні байти діапазону для збігів, що виходять за його межу
+
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            size = -1 if chunk_size is None else chunk_size
+            if remaining is not None:
+                size = remaining if size < 0 else min(size, remaining)
+            chunk = f.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            validator.feed(chunk)
+            scanner.feed(chunk)
+            if end is not None and overlap:
+                tail = (tail + chunk)[-overlap:] if len(chunk) < overlap else chunk[-overlap:]
+        validator.close()
+        counts = scanner.result()
+
+        # Збіги, що починаються в кінці діапазону і закінчуються в наступному
+        if end is not None and overlap:
+            for key, found in count_crossing(matcher, tail, f.read(overlap)).items():
+                counts[key] += found
+
+    if "" in counts:
+        counts[""] = validator.characters + 1  # Як і str.count: кількість символів + 1
+    return counts
+
+
+def count_keywords_mapped(file_path, matcher, start=0, end=None, window=DEFAULT_CHUNK_SIZE):
+    """
+    Рахує входження ключових слів у діапазоні [start, end) файлу, відображеного в пам'ять.
+
+    Результат і помилки кодування ті самі, що й у count_keywords_in_range.
+
+    :param window: Розмір вікна для перевірки UTF-8 та проходу автомата.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        # Порожній файл відобразити неможливо, але й сканувати в ньому нічого
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    try:
+        end = len(buffer) if end is None else min(end, len(buffer))
+        characters = count_characters(buffer, start, end, window)
+        counts = matcher.count_buffer(buffer, start, end, window)
+    finally:
+        if size:
+            buffer.close()
+
+    if "" in counts:
+        counts[""] = characters + 1  # Як і str.count: кількість символів + 1
+    return counts
+
+
+def count_keywords_in_file(file_path, matcher, chunk_size=DEFAULT_CHUNK_SIZE, use_mmap=False, offsets=None):
+    """
+    Рахує входження ключових слів у файлі, читаючи його фрагментами.
+
+    :param file_path: Шлях до файлу.
+    :param matcher: Матчер з build_matcher() або список ключових слів.
+    :param chunk_size: Розмір фрагмента в байтах (None - прочитати файл цілком).
+    :param use_mmap: Відобразити файл у пам'ять замість читання фрагментами.
+    :param offsets: Словник для позицій збігів (лише для PatternMatcher).
+    :return: Словник {слово: кількість входжень}.
+    """
+    if not hasattr(matcher, "scanner"):
+        matcher = build_matcher(matcher)
+    return count_keywords_in_range(file_path, matcher, 0, None, chunk_size, use_mmap, offsets)
+
+
+def _aligned_offset(f, offset):
+    # Зсуває межу діапазону вперед до початку символу UTF-8 (пропускає байти продовження)
+    f.seek(offset)
+    for index, byte in enumerate(f.read(4)):
+        if byte & 0xC0 != 0x80:
+            return offset + index
+    return offset + 4
+
+
+def plan_work(files, matcher, workers, split_size=DEFAULT_SPLIT_SIZE):
+    """
+    Складає список завдань (шлях, початок, кінець) з урахуванням розміру файлів.
+
+    Файли, більші за цільовий розмір завдання, діляться на діапазони байтів
+    (якщо це дозволяє матчер). Завдання впорядковуються від найбільшого до
+    найменшого, щоб великі частини почали оброблятися першими, а дрібні
+    заповнили простої виконавців наприкінці.
+
+    :param files: Список файлів.
+    :param matcher: Матчер з build_matcher().
+    :param workers: Кількість виконавців.
+    :param split_size: Мінімальний розмір діапазону в байтах.
+    :return: Список завдань (шлях, початок, кінець); кінець None означає весь файл.
+    """
+    sizes = {}
+    for file_path in files:
+        try:
+            sizes[file_path] = os.path.getsize(file_path)
+        except OSError:
+            sizes[file_path] = 0  # Помилка буде повідомлена під час обробки файлу
+    total = sum(sizes.values())
+    target = max(split_size, -(-total // (workers * 4)))  # Цільовий розмір одного завдання
+
+    work = []
+    for file_path in files:
+        size = sizes[file_path]
+        parts = -(-size // target)
+        if not matcher.splittable or parts < 2:
+            work.append((size, (file_path, 0, None)))
+            continue
+        try:
+            with open(file_path, 'rb') as f:
+                bounds = [0] + [_aligned_offset(f, size * part // parts) for part in range(1, parts)] + [size]
+        except OSError:
+            work.append((size, (file_path, 0, None)))
+            continue
+        for start, end in zip(bounds, bounds[1:]):
+            if end > start:
+                work.append((end - start, (file_path, start, end)))
+
+    work.sort(key=lambda item: item[0], reverse=True)
+    return [item for _, item in work]
+
+
+def default_workers():
+    # Кількість виконавців за замовчуванням - кількість доступних ядер
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def merge_counts(file_counts, file_path, counts):
+    # Додає лічильники частини файлу до підсумків цього файлу
+    # Лічильники можуть бути неповними (лише знайдені слова), відсутні слова вважаються нулями
+    totals = file_counts.setdefault(file_path, {})
+    for word, count in counts.items():
+        totals[word] = totals.get(word, 0) + count
+
+
+def collect_results(files, keywords, file_counts, failed, offsets=None):
+    """
+    Будує словник результатів {слово: {'files': [...], 'count': n, 'file_counts': {...}}} з підсумків по файлах.
+
+    Файли перелічуються в порядку вхідного списку; файли з помилками пропускаються повністю.
+
+    :param offsets: Позиції збігів {файл: {слово: [...]}}; якщо задано, для кожного
+        слова додається 'offsets': {файл: [(рядок, позиція в рядку), ...]}.
+    """
+    result_dict = {}
+    for file_path in dict.fromkeys(files):
+        if file_path in failed or file_path not in file_counts:
+            continue
+        found_words_count = file_counts[file_path]
+        for word in keywords:
+            if found_words_count.get(word):
+                if word not in result_dict:
+                    # Ініціалізуємо структуру, якщо ключа немає
+                    result_dict[word] = {'files': [], 'count': 0, 'file_counts': {}}
+                    if offsets is not None:
+                        result_dict[word]['offsets'] = {}
+                result_dict[word]['files'].append(file_path)  # Додаємо шлях до файлу
+                result_dict[word]['count'] += found_words_count[word]  # Додаємо кількість знайдених слів
+                result_dict[word]['file_counts'][file_path] = found_words_count[word]  # Кількість у цьому файлі
+                if offsets is not None:
+                    result_dict[word]['offsets'][file_path] = offsets.get(file_path, {}).get(word, [])
+    return result_dict
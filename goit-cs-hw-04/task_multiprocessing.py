@@ -1,78 +1,170 @@
 import os
 import multiprocessing
+import queue
 import time
 import glob
 
-def search_in_files(file_list, keywords, result_queue):
-    """
-    Функція для пошуку ключових слів у списку файлів.
-    
-    :param file_list: Список файлів для обробки.
-    :param keywords: Список ключових слів для пошуку.
-    :param result_queue: Черга для зберігання результатів пошуку.
+from keyword_search import (DEFAULT_CHUNK_SIZE, build_matcher, collect_results, count_keywords_in_range,
+                            default_workers, merge_counts, plan_work)
+
+def search_worker(work_queue, matcher, result_queue, chunk_size=DEFAULT_CHUNK_SIZE, use_mmap=False, offsets=False):
     """
-    result_dict = {}  # Словник для зберігання результатів поточного процесу
+    Процес-виконавець, що забирає завдання зі спільної черги, доки не отримає None.
+
+    Результат кожного завдання одразу надсилається в чергу результатів як
+    (шлях, лічильники знайдених слів, помилка, позиції збігів); після
+    останнього завдання надсилається None.
 
-    for file_path in file_list:
+    :param work_queue: Черга завдань (шлях, початок, кінець).
+    :param matcher: Спільний матчер ключових слів.
+    :param result_queue: Обмежена черга для результатів.
+    :param chunk_size: Розмір фрагмента для потокового читання (None - читати діапазон цілком).
+    :param use_mmap: Сканувати файли, відображені в пам'ять (процес відкриває файл сам, дані не йдуть через черги).
+    :param offsets: Чи надсилати позиції збігів.
+    """
+    while True:
+        item = work_queue.get()
+        if item is None:
+            break
+        file_path, start, end = item
+        file_offsets = {} if offsets else None
         try:
-            # Відкриття файлу для читання
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()  # Читання вмісту файлу
-                # Ініціалізація лічильника знайдених слів для цього файлу
-                found_words_count = {word: 0 for word in keywords}
-                # Перевірка наявності кожного ключового слова у вмісті файлу
-                for word in keywords:
-                    if word in content:
-                        found_words_count[word] += content.count(word)  # Підрахунок кількості знайдених слів
-                        if word not in result_dict:
-                            result_dict[word] = {'files': [], 'count': 0}  # Ініціалізуємо структуру, якщо ключа немає
-                        result_dict[word]['files'].append(file_path)  # Додаємо шлях до файлу
-                        result_dict[word]['count'] += found_words_count[word]  # Додаємо кількість знайдених слів
+            counts = count_keywords_in_range(file_path, matcher, start, end, chunk_size, use_mmap, file_offsets)
         except Exception as e:
-            # Обробка винятків при відкритті файлу
-            print(f"Помилка при обробці файлу {file_path}: {e}")
+            result_queue.put((file_path, None, str(e), None))
+            continue
+        # Надсилаємо лише знайдені слова, щоб не передавати нулі між процесами
+        if file_offsets is not None:
+            file_offsets = {word: positions for word, positions in file_offsets.items() if positions}
+        result_queue.put((file_path, {word: count for word, count in counts.items() if count}, None, file_offsets))
+
+    # Повідомляємо, що процес завершив роботу
+    result_queue.put(None)
+
+def _stream_results(files, matcher, chunk_size, num_processes, use_mmap, queue_size, offsets=False):
+    # Запускає процеси й видає їхні результати (шлях, лічильники, помилка, позиції) в міру надходження.
+    # Матчер будується один раз і передається кожному процесу при старті, тож скомпільований
+    # регулярний вираз відновлюється в процесі один раз, а не для кожного файлу
+    work = plan_work(files, matcher, num_processes or default_workers())  # Завдання від найбільшого
+    num_processes = min(num_processes or default_workers(), len(work))  # Процесів не більше, ніж завдань
+    if not num_processes:
+        return
+    processes = []  # Список для зберігання процесів
+    # Обмежена черга результатів: якщо батьківський процес не встигає, виконавці чекають
+    result_queue = multiprocessing.Queue(maxsize=queue_size or num_processes * 4)
+
+    # Спільна черга завдань; None наприкінці зупиняє кожен процес
+    work_queue = multiprocessing.Queue()
+    for item in work:
+        work_queue.put(item)
+    for _ in range(num_processes):
+        work_queue.put(None)
+
+    try:
+        for _ in range(num_processes):
+            # Створення нового процесу
+            p = multiprocessing.Process(target=search_worker,
+                                        args=(work_queue, matcher, result_queue, chunk_size, use_mmap, offsets))
+            processes.append(p)  # Додаємо процес до списку
+            p.start()  # Запускаємо процес
+
+        # Черга розвантажується, поки процеси ще працюють, тож join() нижче не може заблокуватися
+        running = num_processes
+        while running:
+            try:
+                message = result_queue.get(timeout=1)
+            except queue.Empty:
+                if any(p.exitcode not in (None, 0) for p in processes):
+                    raise Exception("Процес пошуку завершився аварійно")
+                continue
+            if message is None:
+                running -= 1
+            else:
+                yield message
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()  # Викликач перервав ітерацію або сталася помилка
+            p.join()  # Чекаємо завершення всіх процесів
 
-    # Відправляємо результати поточного процесу в чергу
-    result_queue.put(result_dict)
+def iter_search_hits(files, keywords, chunk_size=DEFAULT_CHUNK_SIZE, num_processes=None, use_mmap=False,
+                     errors=None, queue_size=None, whole_word=False, ignore_case=False, regex=False):
+    """
+    Ітератор збігів для багатопроцесорного пошуку: видає збіги, щойно їх знайдено.
+
+    Великий файл може оброблятися частинами, тож для одного файлу може надійти
+    кілька збігів того самого слова - їх кількості треба сумувати. Якщо
+    обробка частини файлу завершилася помилкою, збіги інших його частин могли
+    вже бути видані.
+
+    :param files: Список файлів для обробки.
+    :param keywords: Список ключових слів для пошуку.
+    :param chunk_size: Розмір фрагмента для потокового читання (None - читати файл цілком).
+    :param num_processes: Кількість процесів (за замовчуванням - кількість доступних ядер).
+    :param use_mmap: Відображати файли в пам'ять замість читання фрагментами.
+    :param errors: Словник, у який записуються помилки {файл: опис} (якщо не задано, помилки виводяться).
+    :param queue_size: Місткість черги результатів (за замовчуванням - 4 на процес).
+    :param whole_word: Рахувати лише цілі слова.
+    :param ignore_case: Не враховувати регістр.
+    :param regex: Ключові слова - регулярні вирази.
+    :return: Генератор трійок (шлях, слово, кількість).
+    """
+    matcher = build_matcher(keywords, whole_word, ignore_case, regex)
+    for file_path, counts, error, _ in _stream_results(files, matcher, chunk_size, num_processes, use_mmap,
+                                                       queue_size):
+        if error is not None:
+            if errors is not None:
+                errors.setdefault(file_path, error)
+            else:
+                print(f"Помилка при обробці файлу {file_path}: {error}")
+            continue
+        for word, count in counts.items():
+            yield file_path, word, count
 
-def multiprocessing_search(files, keywords):
+def multiprocessing_search(files, keywords, chunk_size=DEFAULT_CHUNK_SIZE, num_processes=None, use_mmap=False,
+                           errors=None, queue_size=None, whole_word=False, ignore_case=False, regex=False,
+                           offsets=False):
     """
     Функція для запуску пошуку в багатопроцесорному режимі.
+
+    Робота розподіляється за розміром файлів, а не за їх кількістю: великі файли
+    діляться на діапазони байтів, а процеси забирають завдання зі спільної черги,
+    щойно звільняються. Результати об'єднуються по мірі надходження.
     
     :param files: Список файлів для обробки.
     :param keywords: Список ключових слів для пошуку.
+    :param chunk_size: Розмір фрагмента для потокового читання (None - читати файл цілком).
+    :param num_processes: Кількість процесів (за замовчуванням - кількість доступних ядер).
+    :param use_mmap: Відображати файли в пам'ять замість читання фрагментами.
+    :param errors: Словник, у який записуються помилки {файл: опис} (якщо не задано, помилки виводяться).
+    :param queue_size: Місткість черги результатів (за замовчуванням - 4 на процес).
+    :param whole_word: Рахувати лише цілі слова.
+    :param ignore_case: Не враховувати регістр.
+    :param regex: Ключові слова - регулярні вирази.
+    :param offsets: Додати до результатів позиції збігів (номер рядка, позиція в рядку).
     :return: Словник результатів пошуку.
     """
-    num_processes = min(4, len(files))  # Кількість процесів не більше кількості файлів
-    processes = []  # Список для зберігання процесів
-    result_queue = multiprocessing.Queue()  # Черга для обміну результатами
-
-    # Розподіл файлів між процесами
-    files_per_process = len(files) // num_processes  # Кількість файлів на кожен процес
-    for i in range(num_processes):
-        start_index = i * files_per_process  # Початковий індекс для процесу
-        # Визначаємо кінцевий індекс; для останнього процесу беремо залишок
-        end_index = (i + 1) * files_per_process if i != num_processes - 1 else len(files)
-        process_files = files[start_index:end_index]  # Вибір файлів для процесу
-        # Створення нового процесу
-        p = multiprocessing.Process(target=search_in_files, args=(process_files, keywords, result_queue))
-        processes.append(p)  # Додаємо процес до списку
-        p.start()  # Запускаємо процес
-
-    for p in processes:
-        p.join()  # Чекаємо завершення всіх процесів
-
-    # Збираємо результати з черги
-    result_dict = {}
-    while not result_queue.empty():
-        process_result = result_queue.get()
-        for word, data in process_result.items():
-            if word not in result_dict:
-                result_dict[word] = {'files': [], 'count': 0}  # Ініціалізуємо структуру, якщо ключа немає
-            result_dict[word]['files'].extend(data['files'])  # Додаємо файли
-            result_dict[word]['count'] += data['count']  # Додаємо кількість знайдених слів
-
-    return result_dict  # Повертаємо результати пошуку
+    matcher = build_matcher(keywords, whole_word, ignore_case, regex, offsets)
+    file_counts = {}  # Підсумкові лічильники по файлах
+    failed = {}  # Помилки по файлах
+    match_offsets = {} if offsets else None  # Позиції збігів по файлах
+    for file_path, counts, error, file_offsets in _stream_results(files, matcher, chunk_size, num_processes,
+                                                                  use_mmap, queue_size, offsets):
+        if error is not None:
+            failed.setdefault(file_path, error)
+        else:
+            merge_counts(file_counts, file_path, counts)
+            if file_offsets is not None:
+                match_offsets[file_path] = file_offsets
+
+    if errors is not None:
+        errors.update(failed)  # Помилки повертаються викликачу по кожному файлу
+    else:
+        for file_path, error in failed.items():
+            # Обробка винятків при обробці файлу
+            print(f"Помилка при обробці файлу {file_path}: {error}")
+
+    return collect_results(files, keywords, file_counts, failed, match_offsets)  # Повертаємо результати пошуку
 
 if __name__ == "__main__":
     # Вказуємо шлях до директорії, де знаходяться текстові файли
@@ -89,7 +181,8 @@ if __name__ == "__main__":
         print("Не знайдено жодного файлу з розширенням .txt у поточній директорії.")
     else:
         start_time = time.time()  # Записуємо час початку виконання
-        results = multiprocessing_search(files, keywords)  # Викликаємо функцію пошуку
+        errors = {}  # Помилки по файлах (наприклад, файли не в UTF-8)
+        results = multiprocessing_search(files, keywords, use_mmap=True, errors=errors)  # Викликаємо функцію пошуку
         end_time = time.time()  # Записуємо час завершення виконання
 
         print("Результати багатопроцесорного пошуку:")
@@ -97,5 +190,8 @@ if __name__ == "__main__":
         for word, data in results.items():
             print(f"{word}: {data['files']} (Знайдено слів: {data['count']})")
 
+        for file_path, error in errors.items():
+            print(f"Помилка при обробці файлу {file_path}: {error}")
+
         # Виводимо час виконання
         print(f"Час виконання: {end_time - start_time:.2f} секунд")
\ No newline at end of file
@@ -1,67 +1,100 @@
 import os
+import queue
 import threading
 import time
 import glob
 
-def search_in_files(file_list, keywords, result_dict, lock):
+from keyword_search import (DEFAULT_CHUNK_SIZE, build_matcher, collect_results, count_keywords_in_range,
+                            default_workers, merge_counts, plan_work)
+
+def search_worker(work_queue, matcher, file_counts, failed, lock, chunk_size=DEFAULT_CHUNK_SIZE, use_mmap=False,
+                  offsets=None):
     """
-    Функція для пошуку ключових слів у списку файлів.
-    
-    :param file_list: Список файлів для обробки.
-    :param keywords: Список ключових слів для пошуку.
-    :param result_dict: Словник для зберігання результатів пошуку.
-    :param lock: Об'єкт Lock для синхронізації доступу до словника.
+    Виконавець, що забирає завдання зі спільної черги, доки не отримає None.
+
+    :param work_queue: Черга завдань (шлях, початок, кінець).
+    :param matcher: Спільний матчер ключових слів.
+    :param file_counts: Словник підсумкових лічильників по файлах.
+    :param failed: Словник помилок по файлах.
+    :param lock: Об'єкт Lock для синхронізації доступу до словників.
+    :param chunk_size: Розмір фрагмента для потокового читання (None - читати діапазон цілком).
+    :param use_mmap: Сканувати файли, відображені в пам'ять.
+    :param offsets: Словник позицій збігів по файлах (None - позиції не потрібні).
     """
-    for file_path in file_list:
+    while True:
+        item = work_queue.get()
+        if item is None:
+            break
+        file_path, start, end = item
+        file_offsets = {} if offsets is not None else None
         try:
-            # Відкриття файлу для читання
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()  # Читання вмісту файлу
-                # Ініціалізація лічильника знайдених слів для цього файлу
-                found_words_count = {word: 0 for word in keywords}
-                # Перевірка наявності кожного ключового слова у вмісті файлу
-                for word in keywords:
-                    if word in content:
-                        found_words_count[word] += content.count(word)  # Підрахунок кількості знайдених слів
-                        # Використання Lock для синхронізації доступу до словника
-                        with lock:
-                            if word not in result_dict:
-                                result_dict[word] = {'files': [], 'count': 0}  # Ініціалізуємо структуру, якщо ключа немає
-                            result_dict[word]['files'].append(file_path)  # Додаємо шлях до файлу
-                            result_dict[word]['count'] += found_words_count[word]  # Додаємо кількість знайдених слів
+            counts = count_keywords_in_range(file_path, matcher, start, end, chunk_size, use_mmap, file_offsets)
         except Exception as e:
-            # Обробка винятків при відкритті файлу
-            print(f"Помилка при обробці файлу {file_path}: {e}")
+            with lock:
+                failed.setdefault(file_path, str(e))
+            continue
+        # Частини великого файлу можуть оброблятися різними потоками, тож лічильники сумуються
+        with lock:
+            merge_counts(file_counts, file_path, counts)
+            if file_offsets is not None:
+                offsets[file_path] = file_offsets  # Файл з позиціями сканується цілком одним потоком
 
-def threaded_search(files, keywords):
+def threaded_search(files, keywords, chunk_size=DEFAULT_CHUNK_SIZE, num_threads=None, use_mmap=False, errors=None,
+                    whole_word=False, ignore_case=False, regex=False, offsets=False):
     """
     Функція для запуску пошуку в багатопотоковому режимі.
+
+    Робота розподіляється за розміром файлів, а не за їх кількістю: великі файли
+    діляться на діапазони байтів, а потоки забирають завдання зі спільної черги,
+    щойно звільняються.
     
     :param files: Список файлів для обробки.
     :param keywords: Список ключових слів для пошуку.
+    :param chunk_size: Розмір фрагмента для потокового читання (None - читати файл цілком).
+    :param num_threads: Кількість потоків (за замовчуванням - кількість доступних ядер).
+    :param use_mmap: Відображати файли в пам'ять замість читання фрагментами.
+    :param errors: Словник, у який записуються помилки {файл: опис} (якщо не задано, помилки виводяться).
+    :param whole_word: Рахувати лише цілі слова.
+    :param ignore_case: Не враховувати регістр.
+    :param regex: Ключові слова - регулярні вирази.
+    :param offsets: Додати до результатів позиції збігів (номер рядка, позиція в рядку).
     :return: Словник результатів пошуку.
     """
-    num_threads = min(4, len(files))  # Кількість потоків не більше кількості файлів
+    # Матчер (і скомпільований регулярний вираз) будується один раз і спільний для всіх потоків
+    matcher = build_matcher(keywords, whole_word, ignore_case, regex, offsets)
+    work = plan_work(files, matcher, num_threads or default_workers())  # Завдання від найбільшого
+    num_threads = min(num_threads or default_workers(), len(work))  # Потоків не більше, ніж завдань
     threads = []  # Список для зберігання потоків
-    result_dict = {}  # Словник для зберігання результатів
+    file_counts = {}  # Підсумкові лічильники по файлах
+    failed = {}  # Помилки по файлах
+    match_offsets = {} if offsets else None  # Позиції збігів по файлах
     lock = threading.Lock()  # Об'єкт Lock для синхронізації
 
-    # Розподіл файлів між потоками
-    files_per_thread = len(files) // num_threads  # Кількість файлів на кожен потік
-    for i in range(num_threads):
-        start_index = i * files_per_thread  # Початковий індекс для потоку
-        # Визначаємо кінцевий індекс; для останнього потоку беремо залишок
-        end_index = (i + 1) * files_per_thread if i != num_threads - 1 else len(files)
-        thread_files = files[start_index:end_index]  # Вибір файлів для потоку
+    # Спільна черга завдань; None наприкінці зупиняє кожен потік
+    work_queue = queue.Queue()
+    for item in work:
+        work_queue.put(item)
+    for _ in range(num_threads):
+        work_queue.put(None)
+
+    for _ in range(num_threads):
         # Створення нового потоку
-        t = threading.Thread(target=search_in_files, args=(thread_files, keywords, result_dict, lock))
+        t = threading.Thread(target=search_worker, args=(work_queue, matcher, file_counts, failed, lock,
+                                                          chunk_size, use_mmap, match_offsets))
         threads.append(t)  # Додаємо потік до списку
         t.start()  # Запускаємо потік
 
     for t in threads:
         t.join()  # Чекаємо завершення всіх потоків
 
-    return result_dict  # Повертаємо результати пошуку
+    if errors is not None:
+        errors.update(failed)  # Помилки повертаються викликачу по кожному файлу
+    else:
+        for file_path, error in failed.items():
+            # Обробка винятків при обробці файлу
+            print(f"Помилка при обробці файлу {file_path}: {error}")
+
+    return collect_results(files, keywords, file_counts, failed, match_offsets)  # Повертаємо результати пошуку
 
 if __name__ == "__main__":
     # Вказуємо шлях до директорії, де знаходяться текстові файли
@@ -78,7 +111,8 @@ if __name__ == "__main__":
         print("Не знайдено жодного файлу з розширенням .txt у поточній директорії.")
     else:
         start_time = time.time()  # Записуємо час початку виконання
-        results = threaded_search(files, keywords)  # Викликаємо функцію пошуку
+        errors = {}  # Помилки по файлах (наприклад, файли не в UTF-8)
+        results = threaded_search(files, keywords, use_mmap=True, errors=errors)  # Викликаємо функцію пошуку
         end_time = time.time()  # Записуємо час завершення виконання
 
         print("Результати багатопотокового пошуку:")
@@ -86,5 +120,8 @@ if __name__ == "__main__":
         for word, data in results.items():
             print(f"{word}: {data['files']} (Знайдено слів: {data['count']})")
 
+        for file_path, error in errors.items():
+            print(f"Помилка при обробці файлу {file_path}: {error}")
+
         # Виводимо час виконання
         print(f"Час виконання: {end_time - start_time:.2f} секунд")
\ No newline at end of file
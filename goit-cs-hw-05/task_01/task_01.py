@@ -1,58 +1,602 @@
 import argparse
 import asyncio
+import errno
+import hashlib
 import os
 import shutil
 import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
 # Налаштування логування
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-async def copy_file(file_path: Path, output_folder: Path):
+DEFAULT_WORKERS = 8  # Кількість одночасних копіювань за замовчуванням
+DEFAULT_BATCH_SIZE = 64  # Максимальна кількість файлів з однаковим розширенням в одному пакеті
+
+FICLONE = 0x40049409  # ioctl Linux для reflink: спільні блоки файлу без копіювання даних
+
+# Порядок стратегій перенесення: якщо стратегія недоступна, використовується наступна
+STRATEGY_CHAINS = {
+    "auto": ("reflink", "copy_file_range", "sendfile", "copy"),
+    "hardlink": ("hardlink", "reflink", "copy_file_range", "sendfile", "copy"),
+    "move": ("move", "reflink", "copy_file_range", "sendfile", "copy"),
+    "reflink": ("reflink", "copy_file_range", "sendfile", "copy"),
+    "copy_file_range": ("copy_file_range", "sendfile", "copy"),
+    "sendfile": ("sendfile", "copy"),
+    "copy": ("copy",),
+}
+
+# Коди помилок, що означають "стратегія не підтримується для цієї пари файлових систем"
+UNSUPPORTED_ERRORS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOSYS, errno.EPERM}
+
+def _open_target(src, target: Path):
+    # Відкриває ціль без обрізання: обрізати можна лише після перевірки, що це не сам вихідний файл
+    dst = os.fdopen(os.open(target, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666), 'wb')
+    source_stat, target_stat = os.fstat(src.fileno()), os.fstat(dst.fileno())
+    if (source_stat.st_dev, source_stat.st_ino) == (target_stat.st_dev, target_stat.st_ino):
+        dst.close()
+        raise shutil.SameFileError(f"{os.fspath(src.name)!r} and {str(target)!r} are the same file")
+    dst.truncate(0)
+    return dst
+
+def _copy_range(source: Path, target: Path, send):
+    # Копіює весь файл у ядрі викликами send(вихідний дескриптор, цільовий, зсув, кількість)
+    with open(source, 'rb') as src, _open_target(src, target) as dst:
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = send(src.fileno(), dst.fileno(), offset, size - offset)
+            if not sent:
+                break  # Файл скоротився під час копіювання
+            offset += sent
+    shutil.copymode(source, target)
+
+def _reflink(source: Path, target: Path):
+    import fcntl  # Лише для Unix
+    with open(source, 'rb') as src, _open_target(src, target) as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copymode(source, target)
+
+def _hardlink(source: Path, target: Path):
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        target.unlink()  # Як і shutil.copy, замінюємо наявний файл
+        os.link(source, target)
+
+def _move(source: Path, target: Path):
+    os.replace(source, target)
+
+# Реалізації стратегій: функція(вихідний файл, цільовий файл)
+TRANSFER_FUNCTIONS = {
+    "hardlink": _hardlink,
+    "move": _move,
+    "reflink": _reflink,
+    "copy_file_range": lambda source, target: _copy_range(
+        source, target, lambda src, dst, offset, count: os.copy_file_range(src, dst, count, offset)),
+    "sendfile": lambda source, target: _copy_range(
+        source, target, lambda src, dst, offset, count: os.sendfile(dst, src, offset, count)),
+    "copy": shutil.copy,
+}
+
+class FileTransfer:
+    """
+    Перенесення файлів обраною стратегією з автоматичним переходом на наступну в ланцюжку.
+
+    Якщо стратегія не підтримується для пари файлових систем (наприклад, hardlink між
+    різними пристроями чи reflink на ext4), це запам'ятовується, і для наступних файлів
+    з тих самих пристроїв вона більше не пробується. Для кожної стратегії
+    рахуються файли, байти та час, щоб наприкінці вивести пропускну здатність.
+    """
+
+    def __init__(self, strategy: str = "auto"):
+        """
+        :param strategy: Стратегія з STRATEGY_CHAINS.
+        """
+        if strategy not in STRATEGY_CHAINS:
+            raise ValueError(f"Невідома стратегія перенесення: {strategy}")
+        self.strategy = strategy
+        self.chain = [name for name in STRATEGY_CHAINS[strategy] if self.available(name)]
+        self.stats = {}  # Стратегія -> [файли, байти, секунди]
+        self.unsupported = set()  # (стратегія, пристрій джерела, пристрій призначення)
+        self.devices = {}  # Кеш пристроїв цільових папок
+        self.lock = threading.Lock()  # Перенесення виконуються в пулі потоків
+
+    @staticmethod
+    def available(name: str):
+        # Чи є потрібний системний виклик на цій платформі
+        if name == "copy_file_range":
+            return hasattr(os, "copy_file_range")
+        if name == "sendfile":
+            return hasattr(os, "sendfile")
+        if name == "reflink":
+            return os.name == "posix" and os.uname().sysname == "Linux"
+        return True
+
+    def _record(self, name: str, size: int, elapsed: float):
+        with self.lock:
+            totals = self.stats.setdefault(name, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += elapsed
+
+    def transfer(self, source: Path, target: Path):
+        """
+        Переносить файл першою доступною стратегією ланцюжка.
+
+        Як і shutil.copy, кидає shutil.SameFileError, якщо ціль - той самий файл,
+        що й джерело (наприклад, вихідна папка збігається з папкою призначення
+        або ціль - жорстке посилання з попереднього запуску з --strategy hardlink),
+        і не змінює жодного з файлів. Для стратегій hardlink і move наявне жорстке
+        посилання вже є результатом перенесення (для move лишається видалити джерело).
+
+        :return: Назва стратегії, якою перенесено файл.
+        """
+        source_stat = source.stat()
+        size = source_stat.st_size
+        source_device = source_stat.st_dev
+        target_device = self.devices.get(target.parent)
+        if target_device is None:
+            target_device = self.devices[target.parent] = target.parent.stat().st_dev
+
+        if os.path.exists(target) and os.path.samefile(source, target):
+            same_entry = os.path.samefile(source.parent, target.parent) and source.name == target.name
+            if self.strategy not in ("hardlink", "move") or same_entry or target.is_symlink():
+                raise shutil.SameFileError(f"{str(source)!r} and {str(target)!r} are the same file")
+            if self.strategy == "move":
+                source.unlink()
+            self._record(self.strategy, size, 0.0)
+            return self.strategy
+
+        for name in self.chain:
+            devices = (name, source_device, target_device)
+            if devices in self.unsupported:
+                continue
+            start_time = time.perf_counter()
+            try:
+                TRANSFER_FUNCTIONS[name](source, target)
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRORS or name == "copy":
+                    raise
+                with self.lock:
+                    self.unsupported.add(devices)
+                continue
+            elapsed = time.perf_counter() - start_time
+            if self.strategy == "move" and name != "move":
+                source.unlink()  # Переміщення між пристроями: копія, потім видалення джерела
+            self._record(name, size, elapsed)
+            return name
+        raise OSError(f"Жодна стратегія перенесення не підійшла для {source}")
+
+    def report(self):
+        # Виводить у лог кількість файлів, обсяг і пропускну здатність кожної стратегії
+        for name, (files, size, seconds) in self.stats.items():
+            throughput = size / seconds / 1e6 if seconds else 0
+            logging.info(f"Стратегія {name}: {files} файлів, {size / 1e6:.1f} МБ за {seconds:.2f} с "
+                         f"({throughput:.1f} МБ/с)")
+
+class Manifest:
     """
-    Асинхронна функція для копіювання файлів до підпапок на основі розширення.
+    Журнал скопійованих файлів у SQLite для інкрементного та відновлюваного сортування.
+
+    Для кожного вихідного файлу зберігаються розмір, час зміни, SHA-256 вмісту та
+    шлях копії. Повторний запуск копіює лише нові та змінені файли: незмінні
+    відсіюються порівнянням розміру й часу зміни без читання вмісту, а файл,
+    у якого змінився лише час зміни, після перевірки хешу не копіюється. Записи
+    фіксуються пакетами, тож перерваний запуск продовжується з останнього пакета.
+    Швидка перевірка довіряє журналу, лише якщо копія лежить там, куди її
+    поклав би цей запуск, і досі існує: інакше (нова папка призначення чи
+    видалена копія) файл копіюється знову.
+    Файли й папки, що зникли з вихідної папки, видаляються з журналу. Якщо
+    вихідні файли забирає сама стратегія перенесення (move), їх зникнення не
+    вважається видаленням і копії не потрапляють у deleted.
+    """
+
+    COMMIT_INTERVAL = 1000  # Кількість записів між фіксаціями транзакції
+
+    def __init__(self, path: Path, source_folder: Path, output_folder: Path, track_deletions: bool = True):
+        """
+        :param path: Шлях до файлу журналу.
+        :param source_folder: Вихідна папка (у журналі зберігаються відносні шляхи).
+        :param output_folder: Папка призначення, у якій мають лежати копії.
+        :param track_deletions: Чи збирати копії зниклих файлів у deleted (False для стратегії move).
+        """
+        self.source_folder = source_folder
+        self.output_folder = output_folder
+        self.track_deletions = track_deletions
+        # Журнал використовується з потоків пулу, доступ синхронізується self.lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "directory TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "digest TEXT NOT NULL, target TEXT NOT NULL, PRIMARY KEY (directory, name)) WITHOUT ROWID")
+        self.lock = threading.Lock()
+        self.pending = 0  # Записи з останньої фіксації
+        self.visited = set()  # Папки, прочитані під час цього запуску
+        self.unreadable = []  # Папки, які не вдалося прочитати (їхні записи зберігаються)
+        self.deleted = []  # Шляхи копій файлів, що зникли з вихідної папки
+
+    def _directory_key(self, directory: Path):
+        return os.path.relpath(directory, self.source_folder)
+
+    def select_changed(self, directory: Path, files):
+        """
+        Відбирає нові та змінені файли папки й фіксує файли, що з неї зникли.
+
+        :param directory: Прочитана папка.
+        :param files: Файли папки.
+        :return: Список файлів, які треба скопіювати (решта не змінилася з попереднього запуску).
+        """
+        key = self._directory_key(directory)
+        with self.lock:
+            known = {name: (size, mtime_ns, target) for name, size, mtime_ns, target in self.connection.execute(
+                "SELECT name, size, mtime_ns, target FROM files WHERE directory = ?", (key,))}
+            self.visited.add(key)
+
+        changed = []
+        for file_path in files:
+            entry = known.pop(file_path.name, None)
+            if entry is not None:
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue  # Файл зник під час обходу
+                target = target_path(file_path, self.output_folder)
+                if (stat.st_size, stat.st_mtime_ns, str(target)) == entry and target.exists():
+                    continue
+            changed.append(file_path)
+        if known:
+            self._forget(key, known)
+        return changed
+
+    def keep(self, directory: Path):
+        # Папку не вдалося прочитати: її файли та підпапки не вважаються видаленими
+        with self.lock:
+            self.unreadable.append(self._directory_key(directory))
+
+    def lookup(self, file_path: Path):
+        # Повертає (SHA-256, шлях копії) з журналу або None
+        with self.lock:
+            return self.connection.execute(
+                "SELECT digest, target FROM files WHERE directory = ? AND name = ?",
+                (self._directory_key(file_path.parent), file_path.name)).fetchone()
+
+    def record(self, file_path: Path, size: int, mtime_ns: int, digest: str, target: Path):
+        # Записує скопійований файл; транзакція фіксується кожні COMMIT_INTERVAL записів
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files (directory, name, size, mtime_ns, digest, target) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._directory_key(file_path.parent), file_path.name, size, mtime_ns, digest, str(target)))
+            self.pending += 1
+            if self.pending >= self.COMMIT_INTERVAL:
+                self.connection.commit()
+                self.pending = 0
+
+    def _forget(self, key: str, entries):
+        # Видаляє з журналу файли, яких більше немає у вихідній папці
+        with self.lock:
+            self.connection.executemany("DELETE FROM files WHERE directory = ? AND name = ?",
+                                        ((key, name) for name in entries))
+            if self.track_deletions:
+                self.deleted.extend(target for *_, target in entries.values())
+
+    def finish(self):
+        """
+        Після повного обходу видаляє з журналу папки, які не було прочитано, і фіксує зміни.
+
+        Викликається лише після успішного обходу, інакше непрочитані папки
+        вважалися б видаленими.
+        """
+        with self.lock:
+            directories = [key for (key,) in self.connection.execute("SELECT DISTINCT directory FROM files")
+                           if key not in self.visited and not any(
+                               key == skipped or key.startswith(skipped + os.sep) for skipped in self.unreadable)]
+        for key in directories:
+            with self.lock:
+                entries = {name: (target,) for name, target in self.connection.execute(
+                    "SELECT name, target FROM files WHERE directory = ?", (key,))}
+            self._forget(key, entries)
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.pending = 0
+
+def target_path(file_path: Path, output_folder: Path):
+    # Шлях копії: підпапка за розширенням файлу
+    return output_folder / file_path.suffix[1:] / file_path.name
+
+def file_digest(file_path: Path, chunk_size: int = 1 << 20):
+    # SHA-256 вмісту файлу
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def list_directory(directory: Path):
+    """
+    Читає один каталог: повертає списки файлів і підкаталогів.
+
+    Виконується в пулі потоків, бо os.scandir блокує.
+
+    :param directory: Шлях до каталогу.
+    :return: Пара (файли, підкаталоги).
+    """
+    files, subdirectories = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(Path(entry.path))
+            elif entry.is_file():
+                files.append(Path(entry.path))
+    return files, subdirectories
+
+class SortProgress:
+    """
+    Лічильники сортування з періодичним звітом про хід роботи замість запису в лог для кожного файлу.
+
+    Оновлюється з потоків пулу; звіт виводиться не частіше ніж раз на interval секунд.
+    """
+
+    ERROR_LOG_LIMIT = 10  # Скільки помилок кожного типу виводити в лог окремо
+
+    def __init__(self, interval: float = 5.0):
+        """
+        :param interval: Період звіту про хід роботи в секундах.
+        """
+        self.interval = interval
+        self.files = 0  # Скопійовані файли
+        self.bytes = 0  # Обсяг скопійованих файлів
+        self.skipped = 0  # Файли, що не змінилися з попереднього запуску
+        self.errors = Counter()  # Кількість помилок за типом
+        self.start_time = self.last_report = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def copied(self, size: int):
+        with self.lock:
+            self.files += 1
+            self.bytes += size
+
+    def unchanged(self, count: int = 1):
+        with self.lock:
+            self.skipped += count
+
+    def failed(self, file_path: Path, error: Exception):
+        with self.lock:
+            kind = type(error).__name__
+            self.errors[kind] += 1
+            count = self.errors[kind]
+        if count <= self.ERROR_LOG_LIMIT:
+            logging.error(f"Помилка під час копіювання файлу {file_path}: {error}")
+        if count == self.ERROR_LOG_LIMIT:
+            logging.error(f"Подальші помилки {kind} буде враховано лише в підсумку")
+
+    def _rates(self):
+        elapsed = time.perf_counter() - self.start_time
+        return elapsed, self.files / elapsed if elapsed else 0, self.bytes / elapsed if elapsed else 0
+
+    def maybe_report(self):
+        # Виводить хід роботи, якщо з попереднього звіту минуло interval секунд
+        now = time.perf_counter()
+        with self.lock:
+            if now - self.last_report < self.interval:
+                return
+            self.last_report = now
+        elapsed, files_rate, bytes_rate = self._rates()
+        logging.info(f"Скопійовано файлів: {self.files} ({self.bytes / 1e6:.1f} МБ), пропущено: {self.skipped}, "
+                     f"помилок: {sum(self.errors.values())}; {files_rate:.0f} файлів/с, {bytes_rate / 1e6:.1f} МБ/с")
+
+    def summary(self):
+        # Підсумок запуску: кількість файлів, швидкість і помилки за типом
+        elapsed, files_rate, bytes_rate = self._rates()
+        logging.info(f"Скопійовано файлів: {self.files} ({self.bytes / 1e6:.1f} МБ) за {elapsed:.2f} с; "
+                     f"пропущено незмінених: {self.skipped}; {files_rate:.0f} файлів/с, {bytes_rate / 1e6:.1f} МБ/с")
+        if self.errors:
+            details = ", ".join(f"{kind}: {count}" for kind, count in self.errors.most_common())
+            logging.error(f"Помилок: {sum(self.errors.values())} ({details})")
+
+def copy_file_sync(file_path: Path, output_folder: Path, transfer: FileTransfer = None, manifest: Manifest = None,
+                   folders: set = None):
+    """
+    Блокуюче копіювання файлу до підпапки за розширенням (виконується в пулі потоків).
 
     :param file_path: Шлях до файлу, який потрібно скопіювати.
     :param output_folder: Шлях до папки, куди буде скопійовано файл.
+    :param transfer: Стратегія перенесення (None - shutil.copy).
+    :param manifest: Журнал для інкрементного сортування (None - копіювати завжди).
+    :param folders: Множина вже створених цільових папок (None - перевіряти папку для кожного файлу).
+    :return: Цільова папка або None, якщо вміст файлу не змінився і копіювання пропущено.
     """
-    try:
-        ext = file_path.suffix[1:]  # Отримуємо розширення файлів
-        target_folder = output_folder / ext  # Визначаємо цільову папку на основі розширення
+    target = target_path(file_path, output_folder)
+    target_folder = target.parent  # Цільова папка за розширенням файлу
 
-        # Створення підпапки якщо вона не існує
+    if manifest is not None:
+        stat = file_path.stat()  # Розмір і час до копіювання: зміни під час копіювання виявить наступний запуск
+        digest = file_digest(file_path)
+        entry = manifest.lookup(file_path)
+        if entry is not None and entry == (digest, str(target)) and target.exists():
+            manifest.record(file_path, stat.st_size, stat.st_mtime_ns, digest, target)
+            return None
+
+    # Створення підпапки якщо вона не існує (один раз за запуск для кожного розширення)
+    if folders is None or target_folder not in folders:
         target_folder.mkdir(parents=True, exist_ok=True)
+        if folders is not None:
+            folders.add(target_folder)
+
+    # Копіювання файлу
+    if transfer is None:
+        shutil.copy(file_path, target)
+    else:
+        transfer.transfer(file_path, target)
 
-        # Копіювання файлу
-        shutil.copy(file_path, target_folder / file_path.name)
-        logging.info(f"Файл {file_path.name} скопійовано до {target_folder}")
-    except Exception as e:
-        logging.error(f"Помилка під час копіювання файлу {file_path}: {e}")
+    if manifest is not None:
+        manifest.record(file_path, stat.st_size, stat.st_mtime_ns, digest, target)
+    return target_folder
 
-async def read_folder(source_folder: Path, output_folder: Path):
+def copy_batch(files, output_folder: Path, transfer: FileTransfer = None, manifest: Manifest = None,
+               progress: SortProgress = None, folders: set = None):
     """
-    Асинхронна функція для читання файлів з вихідної папки.
+    Копіює пакет файлів з однаковим розширенням одним завданням пулу потоків.
+
+    Помилка окремого файлу враховується в progress і не зупиняє пакет.
+
+    :param files: Файли пакета.
+    :param output_folder: Шлях до папки для збереження файлів.
+    :param transfer: Стратегія перенесення.
+    :param manifest: Журнал для інкрементного сортування.
+    :param progress: Лічильники ходу роботи.
+    :param folders: Множина вже створених цільових папок.
+    """
+    progress = progress if progress is not None else SortProgress()
+    for file_path in files:
+        try:
+            size = file_path.stat().st_size
+            if copy_file_sync(file_path, output_folder, transfer, manifest, folders) is None:
+                progress.unchanged()
+            else:
+                progress.copied(size)
+        except Exception as e:
+            progress.failed(file_path, e)
+    progress.maybe_report()
+
+async def walk_files(source_folder: Path, file_queue: asyncio.Queue, executor=None, manifest: Manifest = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE, progress: SortProgress = None):
+    """
+    Виробник: лінивий обхід дерева каталогів, що передає пакети файлів в обмежену чергу.
+
+    Каталоги читаються по одному в пулі потоків; файли кожного каталогу
+    групуються за розширенням у пакети до batch_size файлів. Якщо черга
+    заповнена, обхід чекає, доки виконавці звільнять місце, тож пам'ять не
+    залежить від розміру дерева.
 
     :param source_folder: Шлях до вихідної папки.
+    :param file_queue: Обмежена черга пакетів файлів для копіювання.
+    :param executor: Пул потоків для читання каталогів.
+    :param manifest: Журнал, за яким пропускаються незмінні файли.
+    :param batch_size: Максимальна кількість файлів у пакеті.
+    :param progress: Лічильники ходу роботи (враховують файли, відсіяні журналом).
+    """
+    loop = asyncio.get_running_loop()
+    pending = [source_folder]  # Каталоги, які ще треба прочитати
+    while pending:
+        directory = pending.pop()
+        try:
+            files, subdirectories = await loop.run_in_executor(executor, list_directory, directory)
+        except OSError as e:
+            logging.error(f"Помилка під час читання папки {directory}: {e}")
+            if manifest is not None:
+                manifest.keep(directory)
+            continue
+        pending.extend(reversed(subdirectories))
+        if manifest is not None:
+            changed = await loop.run_in_executor(executor, manifest.select_changed, directory, files)
+            if progress is not None:
+                progress.unchanged(len(files) - len(changed))
+            files = changed
+
+        by_extension = {}  # Розширення -> файли каталогу
+        for file_path in files:
+            by_extension.setdefault(file_path.suffix, []).append(file_path)
+        for group in by_extension.values():
+            for start in range(0, len(group), batch_size):
+                await file_queue.put(group[start:start + batch_size])  # Чекає, якщо черга заповнена
+
+async def copy_worker(file_queue: asyncio.Queue, output_folder: Path, executor=None, transfer: FileTransfer = None,
+                      manifest: Manifest = None, progress: SortProgress = None, folders: set = None):
+    """
+    Споживач: копіює пакети файлів з черги, доки не отримає None.
+
+    :param file_queue: Черга пакетів файлів для копіювання.
     :param output_folder: Шлях до папки для збереження файлів.
+    :param executor: Пул потоків для копіювання.
+    :param transfer: Стратегія перенесення.
+    :param manifest: Журнал для інкрементного сортування.
+    :param progress: Лічильники ходу роботи.
+    :param folders: Множина вже створених цільових папок.
     """
-    tasks = []  # Список для зберігання асинхронних завдань
+    loop = asyncio.get_running_loop()
+    while True:
+        files = await file_queue.get()
+        try:
+            if files is None:
+                return
+            await loop.run_in_executor(executor, copy_batch, files, output_folder, transfer, manifest, progress,
+                                       folders)
+        finally:
+            file_queue.task_done()
+
+async def read_folder(source_folder: Path, output_folder: Path, workers: int = DEFAULT_WORKERS,
+                      queue_size: int = None, transfer: FileTransfer = None, manifest: Manifest = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE, progress: SortProgress = None):
+    """
+    Асинхронна функція для читання файлів з вихідної папки та їх копіювання.
+
+    Виробник обходить дерево каталогів і кладе пакети файлів з однаковим
+    розширенням в обмежену чергу, а workers споживачів одночасно копіюють їх
+    через пул потоків з такою ж кількістю потоків. Кожна цільова папка
+    створюється один раз за запуск.
 
-    # Рекурсивний обхід усіх файлів у вихідній папці
-    for root, _, files in os.walk(source_folder):
-        for file in files:
-            file_path = Path(root) / file  # Формуємо повний шлях до файлу
-            tasks.append(copy_file(file_path, output_folder))  # Додаємо задачу копіювання
+    :param source_folder: Шлях до вихідної папки.
+    :param output_folder: Шлях до папки для збереження файлів.
+    :param workers: Максимальна кількість одночасних копіювань.
+    :param queue_size: Місткість черги (за замовчуванням - 4 пакети на споживача).
+    :param transfer: Стратегія перенесення (None - shutil.copy).
+    :param manifest: Журнал для інкрементного сортування (None - копіювати всі файли).
+    :param batch_size: Максимальна кількість файлів у пакеті.
+    :param progress: Лічильники ходу роботи (None - створити нові).
+    :return: Лічильники ходу роботи (SortProgress).
+    """
+    file_queue = asyncio.Queue(maxsize=queue_size or workers * 4)
+    progress = progress if progress is not None else SortProgress()
+    folders = set()  # Цільові папки, вже створені під час цього запуску
 
-    # Виконуємо всі завдання асинхронно
-    await asyncio.gather(*tasks)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        consumers = [asyncio.create_task(copy_worker(file_queue, output_folder, executor, transfer, manifest,
+                                                     progress, folders))
+                     for _ in range(workers)]
+        try:
+            await walk_files(source_folder, file_queue, executor, manifest, batch_size, progress)
+        finally:
+            # None зупиняє кожного споживача після того, як черга спорожніє
+            for _ in consumers:
+                await file_queue.put(None)
+            await asyncio.gather(*consumers)
+    return progress
 
 def main():
     parser = argparse.ArgumentParser(description="Асинхронне сортування файлів за розширенням")
     parser.add_argument("source_folder", type=str, help="Вихідна папка з файлами")
     parser.add_argument("output_folder", type=str, help="Папка для збереження файлів")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Кількість одночасних копіювань")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Місткість черги файлів (за замовчуванням - 4 на кожне копіювання)")
+    parser.add_argument("--strategy", choices=list(STRATEGY_CHAINS), default="auto",
+                        help="Спосіб перенесення файлів (недоступні стратегії замінюються наступними)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Максимальна кількість файлів з однаковим розширенням в одному пакеті")
+    parser.add_argument("--progress-interval", type=float, default=5.0,
+                        help="Період звіту про хід роботи в секундах")
+    parser.add_argument("--manifest", type=str, default=None,
+                        help="Файл журналу для інкрементного сортування (копіюються лише нові та змінені файли)")
+    parser.add_argument("--prune", action="store_true",
+                        help="Видаляти копії файлів, що зникли з вихідної папки (разом з --manifest)")
 
     args = parser.parse_args()
+    if args.prune and args.strategy == "move":
+        # Стратегія move сама забирає вихідні файли, тож усі копії виглядали б видаленими
+        parser.error("--prune не можна поєднувати з --strategy move")
     source_folder = Path(args.source_folder)  # Конвертуємо шлях до вихідної папки
     output_folder = Path(args.output_folder)  # Конвертуємо шлях до папки призначення
 
@@ -62,7 +606,28 @@ def main():
         return
 
     # Запуск асинхронної функції для читання папки
-    asyncio.run(read_folder(source_folder, output_folder))
+    transfer = FileTransfer(args.strategy)
+    manifest = (Manifest(Path(args.manifest), source_folder, output_folder,
+                         track_deletions=args.strategy != "move") if args.manifest else None)
+    progress = SortProgress(args.progress_interval)
+    try:
+        asyncio.run(read_folder(source_folder, output_folder, args.workers, args.queue_size, transfer, manifest,
+                                args.batch_size, progress))
+    finally:
+        if manifest is not None:
+            manifest.close()  # Зберігаємо прогрес, щоб перерваний запуск можна було продовжити
+    progress.summary()
+    transfer.report()
+
+    if manifest is not None:
+        manifest.finish()
+        logging.info(f"Видалено з вихідної папки: {len(manifest.deleted)}")
+        if args.prune:
+            for target in manifest.deleted:
+                try:
+                    Path(target).unlink(missing_ok=True)
+                except OSError as e:
+                    logging.error(f"Помилка під час видалення копії {target}: {e}")
     logging.info("Сортування файлів завершено.")
 
 if __name__ == "__main__":
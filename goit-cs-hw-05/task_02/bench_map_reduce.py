@@ -0,0 +1,195 @@
+"""
+Бенчмарк MapReduce-підрахунку слів: попередня реалізація проти паралельного рушія.
+
+Генерує синтетичний корпус заданого розміру (за замовчуванням 1 ГБ) зі
+словами, розподіленими за законом Ципфа, і пунктуацією. Попередня
+реалізація (одне завдання ThreadPoolExecutor на кожне слово і списки
+одиниць у shuffle) на всьому корпусі не вміщується в пам'ять, тому вона
+вимірюється на початковому фрагменті корпусу (--sample-size), а рушій -
+і на фрагменті, і на всьому корпусі. Результати на фрагменті звіряються.
+
+Кожен запуск виконується в окремому процесі; у JSON записуються час
+виконання, процесорний час (разом з процесами пулу), піковий RSS і
+пропускна здатність у МБ/с.
+
+Запуск: python bench_map_reduce.py [--size 1000000000] [--sample-size 20000000]
+        [--workers 1 2 4] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Спільні вимірювання RSS і процесорного часу лежать у корені репозиторію
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from bench_usage import cpu_seconds, peak_rss_bytes
+
+from task_02 import map_function, map_reduce, reduce_function, remove_punctuation, shuffle_function
+
+BLOCK_SIZE = 1 << 20  # Розмір блоку згенерованого тексту
+BLOCK_COUNT = 64  # Кількість різних блоків, з яких складається корпус
+
+
+def legacy_map_reduce(text, search_words=None):
+    # Попередня реалізація map_reduce з task_02.py (для порівняння)
+    text = remove_punctuation(text)
+    words = text.split()
+    if search_words:
+        words = [word for word in words if word in search_words]
+    with ThreadPoolExecutor() as executor:
+        mapped_values = list(executor.map(map_function, words))
+    shuffled_values = shuffle_function(mapped_values)
+    with ThreadPoolExecutor() as executor:
+        reduced_values = list(executor.map(reduce_function, shuffled_values))
+    return dict(reduced_values)
+
+
+# Реалізації: назва -> (функція, чи залежить від кількості процесів)
+ENGINES = {
+    "legacy": (lambda text, workers: legacy_map_reduce(text), False),
+    "engine": (lambda text, workers: map_reduce(text, workers=workers), True),
+}
+
+
+def generate_corpus(path, size, vocabulary_size=50_000, seed=0):
+    """
+    Записує корпус приблизно size байтів з випадкових блоків тексту.
+
+    Блоки генеруються один раз і повторюються у випадковому порядку, тож
+    генерація 1 ГБ займає секунди, а частоти слів у корпусі залишаються
+    нерівномірними.
+    """
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 12)))
+                  for _ in range(vocabulary_size)]
+    weights = [1 / rank for rank in range(1, vocabulary_size + 1)]  # Закон Ципфа
+    punctuation = ["", "", "", "", ",", ".", "!", "?", ";", "'s", '"']
+
+    blocks = []
+    for _ in range(BLOCK_COUNT):
+        words = rng.choices(vocabulary, weights, k=BLOCK_SIZE // 7)
+        lines = (" ".join(word + rng.choice(punctuation) for word in words[start:start + 12])
+                 for start in range(0, len(words), 12))
+        blocks.append(("\n".join(lines) + "\n").encode("utf-8"))
+
+    written = 0
+    with open(path, "wb") as f:
+        while written < size:
+            block = rng.choice(blocks)[:size - written]
+            f.write(block)
+            written += len(block)
+    return written
+
+
+def run_engine(engine, workers, path, size):
+    # Вимірювання всередині дочірнього процесу; результат - один рядок JSON у stdout
+    with open(path, encoding="utf-8") as f:
+        text = f.read(size)
+    function, _ = ENGINES[engine]
+
+    start_times = os.times()
+    start_time = time.perf_counter()
+    results = function(text, workers)
+    wall = time.perf_counter() - start_time
+    end_times = os.times()
+
+    cpu = cpu_seconds(start_times, end_times)  # Разом із процесами пулу
+    peak_rss = peak_rss_bytes(children=True)  # None, якщо виміряти неможливо
+    print(json.dumps({
+        "engine": engine,
+        "workers": workers,
+        "bytes": len(text),
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "peak_rss_bytes": peak_rss,
+        "throughput_mb_s": len(text) / wall / 1e6 if wall else None,
+        "words": sum(results.values()),
+        "distinct_words": len(results),
+        "results": results if size else None,
+    }, ensure_ascii=False))
+
+
+def measure(engine, workers, path, size=0):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", engine, "--workers", str(workers),
+                             "--corpus", path, "--sample-size", str(size)],
+                            check=True, capture_output=True, text=True).stdout
+    measurement = json.loads(output)
+    print(f"{engine:>8} x{workers:<3} {measurement['bytes'] / 1e6:8.0f} МБ {measurement['wall_seconds']:8.2f} с "
+          f"{measurement['throughput_mb_s']:7.1f} МБ/с", file=sys.stderr)
+    return measurement
+
+
+def benchmark(path, worker_counts, sample_size, repeat=1):
+    """
+    Вимірює попередню реалізацію на фрагменті корпусу, а рушій - на фрагменті і на всьому корпусі.
+
+    :return: Список вимірювань (для кожного запуску - окремий запис).
+    """
+    measurements = []
+    for attempt in range(repeat):
+        expected = None
+        for engine, (_, uses_workers) in ENGINES.items():
+            for workers in worker_counts if uses_workers else [1]:
+                measurement = measure(engine, workers, path, sample_size)
+                results = measurement.pop("results")
+                if expected is None:
+                    expected = results
+                elif results != expected:
+                    raise Exception(f"Результати {engine} ({workers} процесів) відрізняються від попередньої реалізації")
+                measurements.append(dict(measurement, attempt=attempt, scope="sample"))
+        for workers in worker_counts:
+            measurement = measure("engine", workers, path)
+            measurement.pop("results")
+            measurements.append(dict(measurement, attempt=attempt, scope="corpus"))
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк MapReduce-підрахунку слів")
+    parser.add_argument("--size", type=int, default=1_000_000_000, help="Розмір корпусу в байтах")
+    parser.add_argument("--sample-size", type=int, default=20_000_000,
+                        help="Розмір фрагмента для порівняння з попередньою реалізацією")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Кількості процесів")
+    parser.add_argument("--repeat", type=int, default=1, help="Кількість повторів кожного запуску")
+    parser.add_argument("--seed", type=int, default=0, help="Початкове значення генератора")
+    parser.add_argument("--corpus", help="Файл корпусу (за замовчуванням - тимчасовий)")
+    parser.add_argument("--output", help="Файл для JSON-звіту (за замовчуванням - stdout)")
+    parser.add_argument("--run", help=argparse.SUPPRESS)  # Внутрішній режим дочірнього процесу
+    args = parser.parse_args()
+
+    if args.run:
+        run_engine(args.run, args.workers[0], args.corpus, args.sample_size or -1)
+        return
+
+    with tempfile.TemporaryDirectory() as temporary:
+        path = args.corpus or os.path.join(temporary, "corpus.txt")
+        if not os.path.exists(path):
+            generate_corpus(path, args.size, seed=args.seed)
+        report = {
+            "corpus": {"bytes": os.path.getsize(path), "sample_bytes": args.sample_size, "seed": args.seed},
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "measurements": benchmark(path, args.workers, args.sample_size, args.repeat),
+        }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,777 @@
+import argparse
+import codecs
+import heapq
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import re
 import string
-from concurrent.futures import ThreadPoolExecutor
-from collections import defaultdict
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain, islice
+from operator import itemgetter
 import requests
+from requests.adapters import HTTPAdapter
 import matplotlib.pyplot as plt
 
-# Функція для завантаження тексту за URL
-def get_text(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Перевірка на помилки HTTP
-        return response.text
-    except requests.RequestException as e:
-        print(f"Error fetching text: {e}")
-        return None
+DEFAULT_CHUNK_SIZE = 1 << 20  # Розмір фрагмента тексту для одного завдання мапінгу (символів)
+DEFAULT_BLOCK_SIZE = 1 << 16  # Розмір блоку байтів під час потокового читання файлу або відповіді HTTP
+DEFAULT_CONCURRENCY = 8  # Кількість одночасних завантажень документів
+DEFAULT_RETRIES = 3  # Кількість повторних спроб завантаження документа
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}  # Статуси HTTP, після яких запит повторюється
+
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)  # Таблиця видалення пунктуації
+
+_WHITESPACE = re.compile(r"\s")  # Пробільні символи, за якими розбиває str.split()
+
+# Потокове читання файлу (шлях або '-' для stdin) блоками байтів
+def iter_file_chunks(path, block_size=DEFAULT_BLOCK_SIZE):
+    if path == "-":
+        yield from iter(lambda: sys.stdin.buffer.read(block_size), b"")
+        return
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(block_size), b"")
+
+# Сесія requests з пулом з'єднань: повторні запити до того самого сервера використовують відкриті з'єднання
+def make_session(pool_size=DEFAULT_CONCURRENCY):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Потокове завантаження документа блоками байтів з повторними спробами для тимчасових помилок
+def iter_url_blocks(session, url, retries=DEFAULT_RETRIES, backoff=0.5, timeout=30, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Видає тіло відповіді блоками байтів (stream=True), не зберігаючи документ цілком.
+
+    Помилки з'єднання, тайм-аути, обірване тіло та статуси RETRY_STATUSES
+    повторюються до retries разів з експоненційною затримкою
+    backoff * 2^спроба; інші помилки HTTP (наприклад, 404) передаються одразу.
+    Якщо частину тіла вже видано, повторний запит продовжує завантаження з
+    заголовком Range; сервер, що не підтримує Range (або стискає тіло),
+    завершує документ помилкою, бо почати заново означало б порахувати
+    початок двічі.
+
+    :param session: Сесія requests з пулом з'єднань.
+    :param url: Адреса документа.
+    :param retries: Кількість повторних спроб.
+    :param backoff: Початкова затримка між спробами в секундах.
+    :param timeout: Тайм-аут з'єднання та читання в секундах.
+    :param block_size: Розмір блоку байтів.
+    """
+    received = 0  # Уже видані байти тіла
+    resumable = False  # Чи можна продовжити з позиції received
+    for attempt in range(retries + 1):
+        if received and not resumable:
+            raise requests.ConnectionError(f"Завантаження {url} обірвалося, а сервер не підтримує Range")
+        headers = {"Range": f"bytes={received}-"} if received else None
+        try:
+            with session.get(url, stream=True, timeout=timeout, headers=headers) as response:
+                if not response.ok:
+                    response.content  # Коротке тіло помилки дочитується, щоб з'єднання повернулося в пул
+                response.raise_for_status()  # Перевірка на помилки HTTP
+                if received and response.status_code != 206:
+                    resumable = False
+                    raise requests.ConnectionError(f"Сервер не продовжив завантаження {url} з байта {received}")
+                if not received:
+                    # Позиції Range рахуються в байтах тіла до розпакування, тож стиснуте тіло не продовжується
+                    resumable = (response.headers.get("Accept-Ranges") == "bytes"
+                                 and response.headers.get("Content-Encoding", "identity") == "identity")
+                for block in response.iter_content(block_size):
+                    received += len(block)
+                    yield block
+                return
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                requests.HTTPError) as e:
+            status = e.response.status_code if e.response is not None else None
+            if attempt == retries or (isinstance(e, requests.HTTPError) and status not in RETRY_STATUSES):
+                raise
+        time.sleep(backoff * 2 ** attempt)
 
 # Функція для видалення знаків пунктуації
 def remove_punctuation(text):
-    return text.translate(str.maketrans("", "", string.punctuation))
+    return text.translate(PUNCTUATION_TABLE)
 
 # Map-функція для підрахунку частоти слів
 def map_function(word):
     return word, 1
 
+# Комбайнер для підрахунку: часткова сума замість списку одиниць
+def combine_counts(total, value):
+    return total + value
+
+# Номер розділу для ключа; crc32 не залежить від PYTHONHASHSEED, тож однаковий у всіх процесах
+def partition_of(key, partitions):
+    return zlib.crc32(str(key).encode("utf-8", "surrogatepass")) % partitions
+
 # Shuffle-функція для групування однакових слів
-def shuffle_function(mapped_values):
-    shuffled = defaultdict(list)
+def shuffle_function(mapped_values, combiner=None, partitions=None):
+    """
+    Групує пари (ключ, значення) за ключем.
+
+    Без комбайнера значення ключа збираються у список, і reduce-функція
+    отримує їх усі. З комбайнером для ключа зберігається лише один
+    накопичувач combiner(накопичувач, значення), наприклад ціле число
+    замість списку одиниць.
+
+    :param mapped_values: Ітерований об'єкт пар (ключ, значення).
+    :param combiner: Асоціативна функція злиття двох значень (None - списки значень).
+    :param partitions: Кількість розділів за хешем ключа (None - без поділу).
+    :return: Пари (ключ, список значень або накопичувач); якщо задано partitions -
+        список з partitions словників {ключ: ...} з ключами, що не перетинаються.
+    """
+    count = partitions or 1
+    shuffled = [defaultdict(list) if combiner is None else {} for _ in range(count)]
     for key, value in mapped_values:
-        shuffled[key].append(value)
-    return shuffled.items()
+        target = shuffled[partition_of(key, count)] if count > 1 else shuffled[0]
+        if combiner is None:
+            target[key].append(value)
+        elif key in target:
+            target[key] = combiner(target[key], value)
+        else:
+            target[key] = value
+    if partitions is None:
+        return shuffled[0].items()
+    return shuffled
 
 # Reduce-функція для підсумування кількості слів
 def reduce_function(key_values):
     key, values = key_values
     return key, sum(values)
 
-# Виконання MapReduce
-def map_reduce(text, search_words=None):
-    # Видалення знаків пунктуації
-    text = remove_punctuation(text)
-    words = text.split()
+# Розподіл часткового результату між розділами за хешем ключа
+def split_partitions(partial, partitions):
+    split = [{} for _ in range(partitions)]
+    for key, value in partial.items():
+        split[partition_of(key, partitions)][key] = value
+    return split
+
+# Поділ тексту на фрагменти приблизно по chunk_size символів без розриву слів
+def split_text(text, chunk_size=DEFAULT_CHUNK_SIZE):
+    start = 0
+    while start < len(text):
+        match = _WHITESPACE.search(text, start + chunk_size)
+        if match is None:
+            yield text[start:]
+            return
+        yield text[start:match.end()]
+        start = match.end()
+
+# Комбайнер: мапінг і локальна агрегація одного фрагмента (виконується в процесі пулу)
+def combine_chunk(chunk, search_words=None, mapper=map_function, combiner=None, partitions=None):
+    """
+    Рахує слова фрагмента тексту і повертає часткові результати {ключ: значення}.
+
+    Для map_function з combine_counts підрахунок виконує Counter. Для інших
+    функцій пари мапера групуються shuffle_function: з комбайнером - одразу
+    в накопичувачі, без нього - у списки значень. Списки лише об'єднуються
+    під час злиття, а reduce-функція отримує всі значення ключа один раз
+    наприкінці, як і в послідовному MapReduce.
+
+    :param chunk: Фрагмент тексту.
+    :param search_words: Множина слів, які потрібно враховувати (None - всі слова).
+    :param mapper: Map-функція слово -> (ключ, значення).
+    :param combiner: Функція злиття двох значень, узгоджена з reduce-функцією (None - списки значень).
+    :param partitions: Кількість розділів за хешем ключа (None - один словник).
+    :return: Словник або, якщо задано partitions, список словників за розділами.
+    """
+    words = remove_punctuation(chunk).split()
+    if mapper is map_function and combiner is combine_counts:
+        partial = Counter(words)
+        if search_words:
+            partial = {word: count for word, count in partial.items() if word in search_words}
+        return split_partitions(partial, partitions) if partitions else partial
 
-    # Якщо задано список слів для пошуку, враховувати тільки ці слова
     if search_words:
         words = [word for word in words if word in search_words]
+    if combiner is not None:
+        shuffled = shuffle_function(map(mapper, words), combiner, partitions)
+        return shuffled if partitions else dict(shuffled)
+    partial = dict(shuffle_function(map(mapper, words)))
+    return split_partitions(partial, partitions) if partitions else partial
+
+# Злиття двох часткових результатів (менший додається до більшого)
+def merge_partials(left, right, combiner=None):
+    if len(left) < len(right):
+        left, right = right, left
+    if combiner is combine_counts:
+        for key, value in right.items():
+            left[key] = left.get(key, 0) + value
+    elif combiner is not None:
+        for key, value in right.items():
+            left[key] = combiner(left[key], value) if key in left else value
+    else:
+        for key, values in right.items():
+            if key in left:
+                left[key].extend(values)  # Списки значень без комбайнера
+            else:
+                left[key] = values
+    return left
+
+# Деревоподібна редукція потоку часткових результатів
+def tree_reduce(partials, combiner=None):
+    """
+    Зливає часткові результати попарно, як у двійковому дереві.
+
+    Результати однакового рівня зливаються, щойно з'являється пара, тож
+    одночасно зберігається не більше log2(n) часткових результатів, а кожен
+    ключ проходить через O(log n) злиттів замість n.
+
+    :param partials: Ітерований об'єкт часткових результатів {ключ: значення}.
+    :param combiner: Функція злиття значень (None - значення є списками, які об'єднуються).
+    :return: Об'єднаний результат {ключ: значення}.
+    """
+    levels = []  # Стек пар (рівень, частковий результат)
+    for partial in partials:
+        level = 0
+        while levels and levels[-1][0] == level:
+            partial = merge_partials(levels.pop()[1], partial, combiner)
+            level += 1
+        levels.append((level, partial))
+
+    result = {}
+    while levels:
+        result = merge_partials(levels.pop()[1], result, combiner)
+    return result
+
+class ExternalShuffle:
+    """
+    Shuffle із зовнішньою пам'яттю для просторів ключів, більших за оперативну пам'ять.
+
+    Часткові результати зливаються в буфер у пам'яті; коли оцінений розмір
+    буфера перевищує memory_budget, він записується на диск як відсортований
+    за ключем прогін (run) і очищується. Редукція k-шляхово зливає прогони
+    (heapq.merge), згортаючи однакові ключі, і видає пари в порядку ключів,
+    тож у пам'яті одночасно перебувають лише буфер і по одному пакету з
+    кожного прогону. Якщо прогонів більше за fan_in, вони спершу зливаються
+    групами в довші прогони, щоб не відкривати забагато файлів. Без комбайнера
+    значеннями є списки, які об'єднуються, а reducer застосовується до кожного
+    ключа один раз під час фінального злиття.
+    """
+
+    ENTRY_OVERHEAD = 72  # Оцінка байтів на запис словника поза самим ключем і значенням
+    RUN_BATCH = 4096  # Кількість пар в одному записі pickle у файлі прогону
+
+    def __init__(self, memory_budget, reducer=reduce_function, combiner=None, directory=None, fan_in=64):
+        """
+        :param memory_budget: Максимальний оцінений розмір буфера в пам'яті в байтах.
+        :param reducer: Reduce-функція, що отримує всі значення ключа (лише без комбайнера).
+        :param combiner: Функція злиття значень (None - списки значень і reducer наприкінці).
+        :param directory: Каталог для тимчасових файлів (None - системний тимчасовий каталог).
+        :param fan_in: Максимальна кількість прогонів в одному злитті.
+        """
+        if memory_budget <= 0:
+            raise ValueError("memory_budget має бути додатним")
+        if fan_in < 2:
+            raise ValueError("fan_in має бути не менше 2")
+        self.memory_budget = memory_budget
+        self.reducer = reducer
+        self.combiner = combiner
+        self.fan_in = fan_in
+        self.temporary = tempfile.TemporaryDirectory(prefix="map_reduce_", dir=directory)
+        self.buffer = {}  # Ключі, накопичені з останнього скидання на диск
+        self.buffer_bytes = 0  # Оцінений розмір буфера
+        self.peak_bytes = 0  # Найбільший оцінений розмір буфера
+        self.runs = []  # Шляхи до файлів відсортованих прогонів
+        self.run_count = 0  # Лічильник для імен файлів прогонів
+        self.spills = 0
+        self.spilled_bytes = 0  # Обсяг записаних на диск прогонів
+
+    def close(self):
+        self.buffer = {}
+        self.runs = []
+        self.temporary.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-    # Паралельний Мапінг
-    with ThreadPoolExecutor() as executor:
-        mapped_values = list(executor.map(map_function, words))
+    def _combine(self, left, right):
+        if self.combiner is not None:
+            return self.combiner(left, right)
+        left.extend(right)
+        return left
 
-    # Крок 2: Shuffle
-    shuffled_values = shuffle_function(mapped_values)
+    def add(self, partial):
+        # Зливає частковий результат у буфер; буфер скидається на диск, щойно перевищить бюджет
+        buffer = self.buffer
+        for key, value in partial.items():
+            if key in buffer:
+                buffer[key] = self._combine(buffer[key], value)
+                if self.combiner is None:
+                    self.buffer_bytes += 8 * len(value)  # Список значень виріс на стільки ж посилань
+            else:
+                buffer[key] = value
+                self.buffer_bytes += sys.getsizeof(key) + sys.getsizeof(value) + self.ENTRY_OVERHEAD
+        self.peak_bytes = max(self.peak_bytes, self.buffer_bytes)
+        if self.buffer_bytes > self.memory_budget:
+            self.spill()
 
-    # Паралельна Редукція
-    with ThreadPoolExecutor() as executor:
-        reduced_values = list(executor.map(reduce_function, shuffled_values))
+    def spill(self):
+        # Записує буфер на диск як прогін, відсортований за ключем
+        if not self.buffer:
+            return
+        items = sorted(self.buffer.items(), key=itemgetter(0))
+        self.buffer = {}
+        self.buffer_bytes = 0
+        self.runs.append(self._write_run(items))
+        self.spills += 1
 
-    return dict(reduced_values)
+    def _write_run(self, items):
+        path = os.path.join(self.temporary.name, f"run_{self.run_count:06d}.pickle")
+        self.run_count += 1
+        batch = []
+        with open(path, "wb") as f:
+            for item in items:
+                batch.append(item)
+                if len(batch) == self.RUN_BATCH:
+                    pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                    batch = []
+            if batch:
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+        self.spilled_bytes += os.path.getsize(path)
+        return path
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                yield from batch
+
+    def _merge(self, streams):
+        # k-шляхове злиття відсортованих потоків пар зі згортанням однакових ключів
+        current = None
+        for key, value in heapq.merge(*streams, key=itemgetter(0)):
+            if current is not None and key == current[0]:
+                current = (key, self._combine(current[1], value))
+            else:
+                if current is not None:
+                    yield current
+                current = (key, value)
+        if current is not None:
+            yield current
+
+    def items(self):
+        """
+        Редукція: пари (ключ, результат) у порядку ключів.
+
+        Залишок буфера зливається з прогонами без запису на диск. Без
+        комбайнера ключ і його список значень передаються в reducer.
+        """
+        # Багатопрохідне злиття, поки прогонів більше, ніж можна відкрити одночасно
+        while len(self.runs) + 1 > self.fan_in:
+            group, self.runs = self.runs[:self.fan_in], self.runs[self.fan_in:]
+            self.runs.append(self._write_run(self._merge([self._read_run(path) for path in group])))
+            for path in group:
+                os.remove(path)
+
+        buffered = sorted(self.buffer.items(), key=itemgetter(0))
+        self.buffer = {}
+        self.buffer_bytes = 0
+        merged = self._merge([buffered] + [self._read_run(path) for path in self.runs])
+        yield from merged if self.combiner is not None else map(self.reducer, merged)
+
+# Паралельний мапінг фрагментів з обмеженою кількістю завдань у роботі
+def map_chunks(chunks, search_words=None, mapper=map_function, workers=None, prefetch=2, combiner=None,
+               partitions=None):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield combine_chunk(chunk, search_words, mapper, combiner, partitions)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()  # Завдання в порядку надсилання
+        for chunk in chunks:
+            pending.append(executor.submit(combine_chunk, chunk, search_words, mapper, combiner, partitions))
+            # Не тримаємо в черзі пулу більше фрагментів, ніж потрібно для завантаження процесів
+            while len(pending) >= workers * prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# Процес-редуктор: деревоподібна редукція часткових результатів одного розділу ключів
+def reduce_worker(partial_queue, result_queue, index, reducer=reduce_function, combiner=None):
+    result = tree_reduce(iter(partial_queue.get, None), combiner)
+    if combiner is None:
+        result = dict(map(reducer, result.items()))  # Кожен ключ редукується один раз, зі всіма значеннями
+    result_queue.put((index, result))
+
+def _put(target_queue, item, processes):
+    # put() з перевіркою, що процеси-редуктори живі (інакше обмежена черга заблокує назавжди)
+    while True:
+        try:
+            target_queue.put(item, timeout=1)
+            return
+        except queue.Full:
+            if any(p.exitcode not in (None, 0) for p in processes):
+                raise Exception("Процес редукції завершився аварійно")
+
+# Паралельна редукція розділених часткових результатів
+def reduce_partitions(partitioned, reducers, reducer=reduce_function, combiner=None, queue_size=4):
+    """
+    Редукує розділи ключів у reducers окремих процесах одночасно з мапінгом.
+
+    Розділ i кожного часткового результату надсилається в обмежену чергу
+    процесу i, який зливає свої розділи деревоподібною редукцією. Діапазони
+    ключів процесів не перетинаються, тож їхні результати просто об'єднуються.
+
+    :param partitioned: Ітерований об'єкт списків з reducers словників {ключ: значення}.
+    :param reducers: Кількість процесів-редукторів (і розділів).
+    :param reducer: Reduce-функція рівня модуля (застосовується лише без комбайнера).
+    :param combiner: Функція злиття значень рівня модуля (None - списки значень).
+    :param queue_size: Місткість черги кожного редуктора.
+    :return: Об'єднаний результат {ключ: значення}.
+    """
+    partial_queues = [multiprocessing.Queue(maxsize=queue_size) for _ in range(reducers)]
+    result_queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=reduce_worker,
+                                         args=(partial_queue, result_queue, index, reducer, combiner))
+                 for index, partial_queue in enumerate(partial_queues)]
+    for p in processes:
+        p.start()
+
+    try:
+        for partials in partitioned:
+            for partial_queue, partial in zip(partial_queues, partials):
+                if partial:
+                    _put(partial_queue, partial, processes)
+        # None зупиняє кожен редуктор після останнього розділу
+        for partial_queue in partial_queues:
+            _put(partial_queue, None, processes)
+
+        # Результати забираються до join(), інакше процес з великим результатом не завершиться
+        result = {}
+        for _ in processes:
+            while True:
+                try:
+                    _, partial = result_queue.get(timeout=1)
+                    break
+                except queue.Empty:
+                    if any(p.exitcode not in (None, 0) for p in processes):
+                        raise Exception("Процес редукції завершився аварійно")
+            result.update(partial)
+        return result
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()  # Сталася помилка під час мапінгу або редукції
+            p.join()
+
+# Виконання MapReduce над потоком фрагментів тексту
+def map_reduce_chunks(chunks, search_words=None, workers=None, mapper=map_function, reducer=reduce_function,
+                      combiner=None, reducers=1):
+    """
+    Мапінг з комбайнером у пулі процесів і деревоподібна редукція часткових результатів.
+
+    Поки процеси пулу рахують наступні фрагменти, головний процес (або
+    reducers процесів-редукторів, кожен зі своїм розділом ключів) зливає
+    вже готові часткові результати.
+
+    :param chunks: Ітерований об'єкт фрагментів тексту (слова не розриваються між фрагментами).
+    :param search_words: Слова, які потрібно враховувати (None - всі слова).
+    :param workers: Кількість процесів (за замовчуванням - кількість ядер; 1 - без пулу).
+    :param mapper: Map-функція рівня модуля (передається в процеси пулу).
+    :param reducer: Reduce-функція рівня модуля; без комбайнера отримує всі значення ключа один раз.
+    :param combiner: Асоціативна функція злиття двох значень, узгоджена з reducer
+        (для reduce_function за замовчуванням - combine_counts).
+    :param reducers: Кількість паралельних процесів-редукторів (1 - редукція в головному процесі).
+    :return: Словник {ключ: результат}.
+    """
+    search_words = frozenset(search_words) if search_words else None
+    if combiner is None and reducer is reduce_function:
+        combiner = combine_counts
+    if reducers > 1:
+        # Редуктори запускаються до пулу мапінгу, поки в процесі ще немає його службових потоків
+        partitioned = map_chunks(chunks, search_words, mapper, workers, combiner=combiner, partitions=reducers)
+        return reduce_partitions(partitioned, reducers, reducer, combiner)
+    result = tree_reduce(map_chunks(chunks, search_words, mapper, workers, combiner=combiner), combiner)
+    return result if combiner is not None else dict(map(reducer, result.items()))
+
+# Виконання MapReduce із зовнішнім shuffle для наборів даних, більших за пам'ять
+def map_reduce_external(chunks, memory_budget, search_words=None, workers=None, mapper=map_function,
+                        reducer=reduce_function, combiner=None, directory=None):
+    """
+    MapReduce з обмеженим обсягом пам'яті для shuffle: буфер понад memory_budget скидається на диск.
+
+    Результат не збирається в словник, а видається парами (ключ, результат)
+    у порядку ключів, тож розмір простору ключів обмежений лише диском.
+    Тимчасові файли видаляються, коли ітерацію завершено або перервано.
+
+    :param chunks: Ітерований об'єкт фрагментів тексту.
+    :param memory_budget: Бюджет пам'яті буфера shuffle в байтах (оцінка за sys.getsizeof).
+    :param directory: Каталог для тимчасових файлів (None - системний тимчасовий каталог).
+    :return: Генератор пар (ключ, результат).
+    """
+    search_words = frozenset(search_words) if search_words else None
+    if combiner is None and reducer is reduce_function:
+        combiner = combine_counts
+    with ExternalShuffle(memory_budget, reducer, combiner, directory) as shuffle:
+        for partial in map_chunks(chunks, search_words, mapper, workers, combiner=combiner):
+            shuffle.add(partial)
+        yield from shuffle.items()
+
+# Виконання MapReduce
+def map_reduce(text, search_words=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, mapper=map_function,
+               reducer=reduce_function, combiner=None, reducers=1):
+    return map_reduce_chunks(split_text(text, chunk_size), search_words, workers, mapper, reducer, combiner,
+                             reducers)
+
+# Інкрементне декодування блоків байтів у фрагменти тексту, що закінчуються на межі слова
+def iter_text_chunks(byte_chunks, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8-sig"):
+    """
+    Перетворює потік блоків байтів на фрагменти тексту приблизно по chunk_size символів.
+
+    Символ UTF-8 або слово, розірване між блоками, переноситься в наступний
+    фрагмент, тож у пам'яті одночасно зберігається не більше одного фрагмента
+    і одного блоку незалежно від розміру входу.
+
+    :param byte_chunks: Ітерований об'єкт блоків байтів (iter_content, файл, stdin).
+    :param chunk_size: Мінімальний розмір фрагмента в символах (крім останнього).
+    :param encoding: Кодування входу; utf-8-sig також відкидає BOM на початку.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pieces = []  # Декодовані блоки поточного фрагмента
+    length = 0
+    for block in byte_chunks:
+        piece = decoder.decode(block)
+        if not piece:
+            continue
+        pieces.append(piece)
+        length += len(piece)
+        if length < chunk_size:
+            continue
+
+        text = "".join(pieces)
+        # Недочитане останнє слово (якщо текст не закінчується пробільним символом)
+        tail = "" if text[-1].isspace() else text.rsplit(None, 1)[-1]
+        if len(tail) == len(text):
+            pieces, length = [text], len(text)  # Немає жодної межі слова - читаємо далі
+            continue
+        yield text[:len(text) - len(tail)]
+        pieces, length = [tail], len(tail)
+
+    pieces.append(decoder.decode(b"", final=True))
+    text = "".join(pieces)
+    if text:
+        yield text
+
+# Потокове виконання MapReduce над блоками байтів
+def map_reduce_stream(byte_chunks, search_words=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                      encoding="utf-8-sig", mapper=map_function, reducer=reduce_function, combiner=None,
+                      reducers=1):
+    return map_reduce_chunks(iter_text_chunks(byte_chunks, chunk_size, encoding), search_words, workers, mapper,
+                             reducer, combiner, reducers)
+
+def _put_unless_stopped(target_queue, item, stop):
+    # put() у спільну чергу, що припиняється, коли споживач завершив ітерацію
+    while not stop.is_set():
+        try:
+            target_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _stream_document(session, url, chunk_queue, stop, chunk_size, encoding, retries, backoff, timeout):
+    # Потік завантаження: фрагменти тексту документа в чергу, наприкінці - маркер (адреса, помилка)
+    error = None
+    try:
+        for chunk in iter_text_chunks(iter_url_blocks(session, url, retries, backoff, timeout), chunk_size,
+                                      encoding):
+            if not _put_unless_stopped(chunk_queue, chunk, stop):
+                return
+    except Exception as e:
+        error = e
+    _put_unless_stopped(chunk_queue, (url, error), stop)
+
+# Фрагменти тексту документів у міру їх завантаження
+def iter_document_chunks(urls, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8-sig", concurrency=DEFAULT_CONCURRENCY,
+                         retries=DEFAULT_RETRIES, errors=None, backoff=0.5, timeout=30, session=None):
+    """
+    Завантажує документи паралельно і передає їхній текст у мапінг потоково.
+
+    Кожен потік пулу читає тіло свого документа блоками, декодує його і кладе
+    фрагменти, що закінчуються на межі слова, у спільну обмежену чергу. У
+    пам'яті одночасно перебувають лише черга та по одному незавершеному
+    фрагменту на потік, незалежно від розміру документів. У роботі не більше
+    concurrency запитів, а список адрес читається ліниво, тож тисячі адрес не
+    створюють тисяч завдань наперед. Поки пул процесів рахує слова,
+    потоки завантаження отримують наступні блоки.
+
+    Якщо документ обірвався після повторних спроб, уже передані фрагменти
+    залишаються врахованими, а помилка записується для його адреси.
+
+    :param urls: Ітерований об'єкт адрес.
+    :param chunk_size: Мінімальний розмір фрагмента в символах.
+    :param encoding: Кодування документів.
+    :param concurrency: Максимальна кількість одночасних запитів (і розмір пулу з'єднань).
+    :param retries: Кількість повторних спроб для тимчасових помилок.
+    :param errors: Словник для помилок завантаження {адреса: текст помилки} (None - виводити в консоль).
+    :param session: Сесія requests (None - нова сесія з пулом на concurrency з'єднань).
+    """
+    own_session = session is None
+    session = session or make_session(concurrency)
+    urls = iter(urls)
+    chunk_queue = queue.Queue(maxsize=concurrency * 2)
+    stop = threading.Event()  # Споживач завершив ітерацію: потоки перестають класти фрагменти
+    running = 0  # Документи, що завантажуються
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for url in islice(urls, concurrency):
+            executor.submit(_stream_document, session, url, chunk_queue, stop, chunk_size, encoding, retries,
+                            backoff, timeout)
+            running += 1
+        while running:
+            item = chunk_queue.get()
+            if isinstance(item, str):
+                yield item
+                continue
+
+            # Маркер завершення документа: на місце завершеного запиту - наступна адреса
+            url, error = item
+            running -= 1
+            if isinstance(error, requests.RequestException):
+                if errors is None:
+                    print(f"Error fetching text: {url}: {error}")
+                else:
+                    errors[url] = str(error)
+            elif error is not None:
+                raise error
+            for url in islice(urls, 1):
+                executor.submit(_stream_document, session, url, chunk_queue, stop, chunk_size, encoding, retries,
+                                backoff, timeout)
+                running += 1
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if own_session:
+            session.close()
+
+# Виконання MapReduce над документами, завантаженими паралельно
+def map_reduce_documents(urls, search_words=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, encoding="utf-8-sig",
+                         concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES, errors=None, reducers=1):
+    chunks = iter_document_chunks(urls, chunk_size, encoding, concurrency, retries, errors)
+    return map_reduce_chunks(chunks, search_words, workers, reducers=reducers)
+
+# Самоперевірка зовнішнього shuffle: вхід і простір ключів у кілька разів більші за бюджет пам'яті
+def self_test_external_shuffle(memory_budget=256 * 1024, factor=8, seed=0):
+    rng = random.Random(seed)
+    # ~155 байтів оціненого розміру на ключ і ~7 символів на слово в тексті; слова повторюються,
+    # щоб перевірити згортання однакових ключів з різних прогонів
+    distinct = factor * memory_budget // 155
+    words = [f"w{rng.randrange(distinct)}" for _ in range(factor * memory_budget // 6)]
+    text = " ".join(words) + "\n"
+    expected = sorted(Counter(words).items())
+    if len(text) < factor * memory_budget:
+        raise Exception("Вхід самоперевірки менший, ніж потрібно")
+
+    # Зовнішній shuffle напряму: скидання на диск і багатопрохідне злиття (fan_in=4)
+    with ExternalShuffle(memory_budget, combiner=combine_counts, fan_in=4) as shuffle:
+        for partial in map_chunks(split_text(text, 4096), workers=1, combiner=combine_counts):
+            shuffle.add(partial)
+        spills = shuffle.spills
+        result = list(shuffle.items())
+    if result != expected:
+        raise Exception("Результат зовнішнього shuffle відрізняється від Counter")
+    if spills < factor // 2 or shuffle.peak_bytes > 2 * memory_budget:
+        raise Exception(f"Буфер не тримається в бюджеті: {spills} скидань, пік {shuffle.peak_bytes} байтів")
+
+    # Повний конвеєр з пулом процесів
+    result = list(map_reduce_external(split_text(text, 4096), memory_budget, workers=2))
+    if result != expected:
+        raise Exception("Результат map_reduce_external відрізняється від Counter")
+    print(f"Зовнішній shuffle: {len(text)} символів, {len(expected)} ключів, бюджет {memory_budget} байтів, "
+          f"{spills} скидань на диск - OK")
+
+# Самоперевірка завантаження: локальний HTTP-сервер замість мережі
+def self_test_fetch(documents=40, concurrency=4):
+    rng = random.Random(1)
+    texts = {f"/doc{index}.txt": " ".join(f"word{rng.randrange(50)}" for _ in range(rng.randrange(1, 2000))).encode()
+             for index in range(documents)}
+    flaky = {"/doc1.txt", "/doc2.txt"}  # Перший запит до цих документів отримує 503
+    broken = {"/doc3.txt"}  # Перша відповідь обривається посередині тіла; повтор продовжується з Range
+    texts["/doc3.txt"] = " ".join(f"word{rng.randrange(50)}" for _ in range(50000)).encode()
+    state = {"active": 0, "peak": 0, "requests": 0, "connections": set()}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Постійні з'єднання, щоб перевірити пул
+
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                state["requests"] += 1
+                state["connections"].add(self.client_address)
+                failing = self.path in flaky
+                breaking = self.path in broken
+                flaky.discard(self.path)
+                broken.discard(self.path)
+            try:
+                time.sleep(0.01)  # Затримка, щоб запити перекривалися
+                body = texts.get(self.path)
+                status = 503 if failing else 404 if body is None else 200
+                body = body if status == 200 else b""
+                start = int(self.headers["Range"][6:-1]) if status == 200 and self.headers["Range"] else 0
+                self.send_response(206 if start else status)
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(len(body) - start))
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                self.end_headers()
+                if breaking:
+                    self.wfile.write(body[:len(body) // 2])
+                    self.close_connection = True  # Тіло обривається, з'єднання закривається
+                else:
+                    self.wfile.write(body[start:])
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [base + path for path in texts] + [base + "/missing.txt"]
+        errors = {}
+        result = map_reduce_chunks(iter_document_chunks(urls, chunk_size=1000, concurrency=concurrency, errors=errors),
+                                   workers=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    expected = dict(Counter(b" ".join(texts.values()).decode().split()))
+    if result != expected:
+        raise Exception("Результат для завантажених документів відрізняється від Counter")
+    if list(errors) != [base + "/missing.txt"]:
+        raise Exception(f"Неочікувані помилки завантаження: {errors}")
+    if state["peak"] > concurrency:
+        raise Exception(f"Одночасних запитів {state['peak']} більше, ніж {concurrency}")
+    # Нове з'єднання потрібне лише замість обірваного
+    if state["requests"] != len(urls) + 3 or len(state["connections"]) > concurrency + 1:
+        raise Exception(f"Запитів: {state['requests']}, з'єднань: {len(state['connections'])}")
+    print(f"Завантаження: {len(urls)} документів, {state['requests']} запитів через "
+          f"{len(state['connections'])} з'єднань, до {state['peak']} одночасно - OK")
 
 # Функція для візуалізації результатів
 def visualize_top_words(word_counts, top_n=10):
@@ -80,16 +796,48 @@ def visualize_top_words(word_counts, top_n=10):
 
 # Головний блок коду
 if __name__ == '__main__':
-    # Вхідний текст для обробки за URL
-    url = "https://www.gutenberg.org/files/1342/1342-0.txt"  # Приклад  (PRIDE and PREJUDICE by Jane Austen)
-    text = get_text(url)
-    
-    if text:
-        # Виконання MapReduce на вхідному тексті
-        search_words = None  # Можна вказати слова для фільтрації, наприклад: ['war', 'peace', 'love']
-        result = map_reduce(text, search_words)
-        
-        # Виведення результатів підрахунку топ-10 слів
-        visualize_top_words(result, top_n=10)
+    parser = argparse.ArgumentParser(description="Потоковий MapReduce-підрахунок слів")
+    # Приклад (PRIDE and PREJUDICE by Jane Austen)
+    parser.add_argument("sources", nargs="*", default=["https://www.gutenberg.org/files/1342/1342-0.txt"],
+                        help="URL, шляхи до файлів або '-' для stdin")
+    parser.add_argument("--urls-file", help="Файл зі списком URL документів (по одному в рядку)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Кількість одночасних завантажень документів")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Кількість повторних спроб завантаження")
+    parser.add_argument("--search-words", nargs="+", help="Слова для фільтрації, наприклад: war peace love")
+    parser.add_argument("--workers", type=int, default=None, help="Кількість процесів (за замовчуванням - кількість ядер)")
+    parser.add_argument("--reducers", type=int, default=1, help="Кількість паралельних процесів-редукторів")
+    parser.add_argument("--memory-budget", type=int, default=None,
+                        help="Бюджет пам'яті shuffle в байтах; понад нього дані скидаються на диск")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Розмір фрагмента тексту в символах")
+    parser.add_argument("--encoding", default="utf-8-sig", help="Кодування вхідного тексту")
+    parser.add_argument("--top", type=int, default=10, help="Кількість слів на діаграмі")
+    parser.add_argument("--self-test", action="store_true", help="Виконати самоперевірку і завершити роботу")
+    args = parser.parse_args()
+
+    if args.self_test:
+        self_test_external_shuffle()
+        self_test_fetch()
+        sys.exit()
+
+    urls = [source for source in args.sources if source.startswith(("http://", "https://"))]
+    files = [source for source in args.sources if source not in urls]
+    if args.urls_file:
+        with open(args.urls_file, encoding="utf-8") as f:
+            urls.extend(line.strip() for line in f if line.strip())
+
+    try:
+        # Документи за URL завантажуються паралельно й потрапляють у мапінг, щойно завантажені;
+        # файли читаються потоково без завантаження всього тексту в пам'ять
+        chunks = chain(iter_document_chunks(urls, args.chunk_size, args.encoding, args.concurrency, args.retries),
+                       *(iter_text_chunks(iter_file_chunks(path), args.chunk_size, args.encoding) for path in files))
+        if args.memory_budget:
+            pairs = map_reduce_external(chunks, args.memory_budget, args.search_words, args.workers)
+            result = dict(heapq.nlargest(args.top, pairs, key=itemgetter(1)))
+        else:
+            result = map_reduce_chunks(chunks, args.search_words, args.workers, reducers=args.reducers)
+    except (requests.RequestException, OSError) as e:
+        print(f"Помилка: Не вдалося отримати вхідний текст: {e}")
     else:
-        print("Помилка: Не вдалося отримати вхідний текст.")
+        # Виведення результатів підрахунку топ-N слів
+        visualize_top_words(result, top_n=args.top)